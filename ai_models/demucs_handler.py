@@ -10,7 +10,8 @@ import shutil
 import tempfile
 import time
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Callable
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any, Callable, Tuple
 import logging
 
 import torch
@@ -363,14 +364,32 @@ class DemucsHandler:
             logger.info("Demucs model cleaned up")
 
 
-# Global handler instance for reuse
-_demucs_handler = None
+# Handlers for reuse, keyed by model and device; a worker keeps at most
+# MAX_CACHED_HANDLERS models loaded, least recently used evicted first
+MAX_CACHED_HANDLERS = 2
+_demucs_handlers: "OrderedDict[Tuple[str, str], DemucsHandler]" = OrderedDict()
 
 def get_demucs_handler(config: Optional[DemucsConfig] = None) -> DemucsHandler:
-    """Get a global instance of the Demucs handler."""
-    global _demucs_handler
+    """
+    Get the process-wide Demucs handler for the config's model and device.
     
-    if _demucs_handler is None:
-        _demucs_handler = DemucsHandler(config)
+    A cached handler keeps its loaded model and takes the config's other settings.
+    """
+    config = config or DemucsConfig()
+    key = (config.model_name, config.device)
     
-    return _demucs_handler 
\ No newline at end of file
+    handler = _demucs_handlers.pop(key, None)
+    if handler is None:
+        handler = DemucsHandler(config)
+    else:
+        # Keep the segment length computed when the model was loaded
+        if config.segment_length is None:
+            config.segment_length = handler.config.segment_length
+        handler.config = config
+    _demucs_handlers[key] = handler
+    
+    while len(_demucs_handlers) > MAX_CACHED_HANDLERS:
+        _, evicted = _demucs_handlers.popitem(last=False)
+        evicted.cleanup()
+    
+    return handler
@@ -11,7 +11,8 @@ import time
 import json
 import tempfile
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Callable
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any, Callable, Tuple
 import logging
 
 import torch
@@ -392,14 +393,29 @@ class WhisperHandler:
             logger.info("Whisper model cleaned up")
 
 
-# Global handler instance for reuse
-_whisper_handler = None
+# Handlers for reuse, keyed by model and device; a worker keeps at most
+# MAX_CACHED_HANDLERS models loaded, least recently used evicted first
+MAX_CACHED_HANDLERS = 2
+_whisper_handlers: "OrderedDict[Tuple[str, str], WhisperHandler]" = OrderedDict()
 
 def get_whisper_handler(config: Optional[WhisperConfig] = None) -> WhisperHandler:
-    """Get a global instance of the Whisper handler."""
-    global _whisper_handler
+    """
+    Get the process-wide Whisper handler for the config's model and device.
     
-    if _whisper_handler is None:
-        _whisper_handler = WhisperHandler(config)
+    A cached handler keeps its loaded model and takes the config's other settings.
+    """
+    config = config or WhisperConfig()
+    key = (config.model_name, config.device)
     
-    return _whisper_handler 
\ No newline at end of file
+    handler = _whisper_handlers.pop(key, None)
+    if handler is None:
+        handler = WhisperHandler(config)
+    else:
+        handler.config = config
+    _whisper_handlers[key] = handler
+    
+    while len(_whisper_handlers) > MAX_CACHED_HANDLERS:
+        _, evicted = _whisper_handlers.popitem(last=False)
+        evicted.cleanup()
+    
+    return handler
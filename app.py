@@ -5,13 +5,14 @@ Handles API routing, middleware, and application startup.
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 import uvicorn
 import os
 from contextlib import asynccontextmanager
 
 from config import settings
+from database.redis_client import create_async_redis
 from utils.logger import setup_logging, logger
 from routes import health, upload, status, results, static
 
@@ -25,10 +26,14 @@ async def lifespan(app: FastAPI):
     # Ensure storage directories exist
     settings.create_directories()
     
+    # Shared asyncio Redis client for request handlers
+    app.state.redis = create_async_redis()
+    
     yield
     
     # Shutdown
     logger.info("Shutting down Karaoke Backend API")
+    await app.state.redis.aclose(close_connection_pool=True)
 
 
 # Initialize FastAPI app
@@ -38,6 +43,7 @@ app = FastAPI(
     description="A powerful backend for processing audio files into karaoke-ready content",
     docs_url="/docs" if settings.debug else None,
     redoc_url="/redoc" if settings.debug else None,
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -95,6 +101,24 @@ async def general_exception_handler(request: Request, exc: Exception):
     )
 
 
+# Upload size limit, checked before the request body is read
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    """Reject uploads whose declared size exceeds the limit with 413."""
+    if (request.method == "POST" and request.url.path == "/api/process"
+            and upload.upload_too_large(request.headers.get("content-length"))):
+        max_size_mb = settings.max_file_size_bytes // (1024 * 1024)
+        return JSONResponse(
+            status_code=413,
+            content={
+                "error": True,
+                "message": f"File too large. Maximum size is {max_size_mb}MB",
+                "status_code": 413
+            }
+        )
+    return await call_next(request)
+
+
 # Request logging middleware
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
@@ -156,5 +180,7 @@ if __name__ == "__main__":
         host=settings.host,
         port=settings.port,
         reload=settings.debug,
-        log_level=settings.log_level.lower()
+        log_level=settings.log_level.lower(),
+        http="httptools",
+        loop="uvloop"
     ) 
\ No newline at end of file
@@ -51,13 +51,23 @@ celery_app.conf.update(
     worker_prefetch_multiplier=1,  # Process one task at a time for memory efficiency
     task_acks_late=True,  # Acknowledge tasks after completion
     worker_max_tasks_per_child=50,  # Restart worker after 50 tasks to prevent memory leaks
+    worker_proc_alive_timeout=300,  # Child init includes loading the stage models (tasks.stem_separation)
     
     # Task time limits
     task_time_limit=30 * 60,  # 30 minutes hard limit
     task_soft_time_limit=25 * 60,  # 25 minutes soft limit
     
+    # Broker connections: reuse pooled connections and keep idle ones alive
+    broker_pool_limit=10,
+    broker_connection_timeout=4.0,
+    broker_transport_options={
+        'socket_keepalive': True,
+        'socket_connect_timeout': 4.0,
+    },
+
     # Result backend settings
     result_expires=3600,  # Results expire after 1 hour
+    redis_socket_keepalive=True,
     result_backend_transport_options={
         'retry_on_timeout': True,
         'visibility_timeout': 3600,
@@ -124,6 +134,11 @@ def worker_shutdown_handler(sender=None, **kwargs):
     logger.info("Celery worker is shutting down", worker=sender.hostname)
 
 
+def worker_consumes(queue: str) -> bool:
+    """Check whether this worker consumes from a queue (all queues unless -Q was given)."""
+    return queue in celery_app.amqp.queues.consume_from
+
+
 # Task decorators and utilities
 def get_task_logger(task_name: str):
     """Get a logger for a specific task."""
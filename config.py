@@ -24,6 +24,7 @@ class Settings(BaseSettings):
     redis_port: int = Field(default=6379, env="REDIS_PORT")
     redis_db: int = Field(default=0, env="REDIS_DB")
     redis_password: Optional[str] = Field(default=None, env="REDIS_PASSWORD")
+    redis_max_connections: int = Field(default=64, env="REDIS_MAX_CONNECTIONS")
     
     # Celery Configuration
     celery_broker_url: str = Field(default="redis://localhost:6379/0", env="CELERY_BROKER_URL")
@@ -44,6 +45,8 @@ class Settings(BaseSettings):
     max_concurrent_jobs: int = Field(default=3, env="MAX_CONCURRENT_JOBS")
     job_timeout: int = Field(default=3600, env="JOB_TIMEOUT")  # 1 hour
     cleanup_interval: int = Field(default=86400, env="CLEANUP_INTERVAL")  # 24 hours
+    preload_models: bool = Field(default=True, env="PRELOAD_MODELS")  # Load models at worker process start
+    parallel_stages: bool = Field(default=True, env="PARALLEL_STAGES")  # Run stages as a chord on the stage queues
     
     # Logging Configuration
     log_level: str = Field(default="INFO", env="LOG_LEVEL")
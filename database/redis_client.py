@@ -4,8 +4,9 @@ Handles connection pooling, basic CRUD operations, and job state management.
 """
 
 import redis
+import redis.asyncio as aioredis
 import json
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Sequence, Union
 from contextlib import contextmanager
 import pickle
 
@@ -34,7 +35,7 @@ class RedisClient:
                 db=settings.redis_db,
                 password=settings.redis_password,
                 decode_responses=True,
-                max_connections=20,
+                max_connections=settings.redis_max_connections,
                 retry_on_timeout=True,
                 socket_connect_timeout=5,
                 socket_timeout=5
@@ -139,22 +140,42 @@ class RedisClient:
             logger.error("Redis KEYS failed", pattern=pattern, error=str(e))
             return []
     
-    def hset(self, name: str, mapping: Dict[str, Any]) -> int:
-        """Set hash fields."""
+    def pipeline(self, transaction: bool = False):
+        """Get a pipeline for batching several commands into one round trip."""
+        return self.client.pipeline(transaction=transaction)
+    
+    @staticmethod
+    def encode_mapping(mapping: Dict[str, Any]) -> Dict[str, str]:
+        """Convert hash values to the string form stored in Redis, leaving None values out."""
+        processed_mapping = {}
+        for key, value in mapping.items():
+            if value is None:
+                continue  # Unset fields are deleted by hset rather than stored as "None"
+            if isinstance(value, (dict, list)):
+                processed_mapping[key] = json.dumps(value)
+            elif hasattr(value, 'value'):  # Handle Enum types
+                processed_mapping[key] = value.value
+            else:
+                processed_mapping[key] = str(value)
+        return processed_mapping
+    
+    def hset(self, name: str, mapping: Dict[str, Any], clear: Sequence[str] = ()) -> int:
+        """
+        Set hash fields, deleting the fields in ``clear`` and any None-valued
+        fields in the same round trip.
+        """
         try:
             # Convert values to JSON strings if needed
-            processed_mapping = {}
-            for key, value in mapping.items():
-                if isinstance(value, (dict, list)):
-                    processed_mapping[key] = json.dumps(value)
-                elif value is None:
-                    processed_mapping[key] = "None"  # Store None as "None" string for clarity
-                elif hasattr(value, 'value'):  # Handle Enum types
-                    processed_mapping[key] = value.value
-                else:
-                    processed_mapping[key] = str(value)
-            
-            return self.client.hset(name, mapping=processed_mapping)
+            encoded = self.encode_mapping(mapping)
+            cleared = [key for key, value in mapping.items() if value is None]
+            cleared.extend(clear)
+            if not cleared:
+                return self.client.hset(name, mapping=encoded)
+            pipe = self.client.pipeline()
+            if encoded:
+                pipe.hset(name, mapping=encoded)
+            pipe.hdel(name, *cleared)
+            return pipe.execute()[0] if encoded else 0
         except Exception as e:
             logger.error("Redis HSET failed", name=name, error=str(e))
             return 0
@@ -176,6 +197,30 @@ class RedisClient:
             logger.error("Redis HGET failed", name=name, key=key, error=str(e))
             return None
     
+    @staticmethod
+    def parse_hash(data: Dict[str, str]) -> Dict[str, Any]:
+        """Convert raw hash values to Python types (JSON, numbers, booleans)."""
+        processed_data = {}
+        for key, value in data.items():
+            if value == "":  # Handle empty strings as None
+                processed_data[key] = None
+            elif value == "None":  # Keep "None" string as "None" for proper enum handling
+                processed_data[key] = "None"
+            else:
+                try:
+                    processed_data[key] = json.loads(value)
+                except (json.JSONDecodeError, TypeError):
+                    # Try to convert to appropriate types
+                    if value.lower() in ('true', 'false'):
+                        processed_data[key] = value.lower() == 'true'
+                    elif value.isdigit():
+                        processed_data[key] = int(value)
+                    elif value.replace('.', '').isdigit():
+                        processed_data[key] = float(value)
+                    else:
+                        processed_data[key] = value
+        return processed_data
+    
     def hgetall(self, name: str, parse_json: bool = True) -> Dict[str, Any]:
         """Get all hash fields and values."""
         try:
@@ -184,31 +229,20 @@ class RedisClient:
                 return {}
             
             if parse_json:
-                processed_data = {}
-                for key, value in data.items():
-                    if value == "":  # Handle empty strings as None
-                        processed_data[key] = None
-                    elif value == "None":  # Keep "None" string as "None" for proper enum handling
-                        processed_data[key] = "None"
-                    else:
-                        try:
-                            processed_data[key] = json.loads(value)
-                        except (json.JSONDecodeError, TypeError):
-                            # Try to convert to appropriate types
-                            if value.lower() in ('true', 'false'):
-                                processed_data[key] = value.lower() == 'true'
-                            elif value.isdigit():
-                                processed_data[key] = int(value)
-                            elif value.replace('.', '').isdigit():
-                                processed_data[key] = float(value)
-                            else:
-                                processed_data[key] = value
-                return processed_data
+                return self.parse_hash(data)
             return data
         except Exception as e:
             logger.error("Redis HGETALL failed", name=name, error=str(e))
             return {}
     
+    def hmget(self, name: str, keys: List[str]) -> List[Optional[str]]:
+        """Get the raw values of several hash fields (None for missing fields)."""
+        try:
+            return self.client.hmget(name, keys)
+        except Exception as e:
+            logger.error("Redis HMGET failed", name=name, error=str(e))
+            return [None] * len(keys)
+    
     def hdel(self, name: str, *keys: str) -> int:
         """Delete hash fields."""
         try:
@@ -271,6 +305,21 @@ def get_redis_client():
         pass  # Connection pooling handles cleanup
 
 
+def create_async_redis() -> aioredis.Redis:
+    """Create an asyncio Redis client backed by a shared connection pool."""
+    pool = aioredis.ConnectionPool(
+        host=settings.redis_host,
+        port=settings.redis_port,
+        db=settings.redis_db,
+        password=settings.redis_password,
+        decode_responses=True,
+        max_connections=settings.redis_max_connections,
+        socket_connect_timeout=5,
+        socket_timeout=5
+    )
+    return aioredis.Redis(connection_pool=pool)
+
+
 def test_redis_connection() -> bool:
     """Test Redis connection and basic operations."""
     try:
@@ -3,12 +3,15 @@ Job model and state management for the Karaoke Backend.
 Handles job creation, status tracking, progress monitoring, and persistence.
 """
 
+import json
+import os
 import uuid
 import time
 from datetime import datetime, timedelta
 from enum import Enum
 from typing import Dict, List, Optional, Any
 from pydantic import BaseModel, Field
+from cachetools import TTLCache
 
 from database.redis_client import redis_client
 from utils.logger import get_logger
@@ -16,6 +19,76 @@ from config import settings
 
 logger = get_logger("job_model")
 
+# Minimum seconds between EXPIRE refreshes for the same job key
+EXPIRE_REFRESH_INTERVAL = 30
+
+# Overall job progress covered by the parallel processing stages (30% -> 85%)
+STAGES_PROGRESS_START = 30
+STAGES_PROGRESS_SPAN = 55
+
+# Pre-rendered JSON of a completed job's results (see routes/results.py), stored as a
+# hash of the rendered body and the job's updated_at it was rendered from; a body whose
+# updated_at no longer matches the job is stale. Writes that leave updated_at alone
+# (output files, file cleanup) delete it instead.
+RESULTS_CACHE_KEY = "job:{job_id}:results_cache"
+RESULTS_CACHE_TTL = 86400
+
+# Pre-rendered JobStatusResponse JSON (see routes/status.py). Every write to the
+# job hash deletes it; the status route renders and stores it again on the next poll.
+STATUS_JSON_FIELD = "status_json"
+
+# JSON list of [download link key, path] pairs for a completed job's output files
+OUTPUT_FILES_FIELD = "output_files_json"
+
+# (download link key, job hash path field, stage status field) for every file a job
+# can produce; files of a stage are only listed once that stage has completed
+OUTPUT_FILE_SOURCES = (
+    ("vocals_stem", "stem_separation_vocals_path", "stem_separation_status"),
+    ("drums_stem", "stem_separation_drums_path", "stem_separation_status"),
+    ("bass_stem", "stem_separation_bass_path", "stem_separation_status"),
+    ("other_stem", "stem_separation_other_path", "stem_separation_status"),
+    ("transcription", "transcription_path", "transcription_status"),
+    ("beat_analysis", "beat_analysis_json", "beat_analysis_status"),
+    ("beat_beats", "beats_json", "beat_analysis_status"),
+    ("beat_onsets", "onsets_json", "beat_analysis_status"),
+    ("cover_image", "metadata_cover_image_path", None),
+)
+
+
+# JSON object mapping each file name in a completed job's directory to its path
+# relative to the job directory, and the subdirectories searched in precedence order
+FILE_INDEX_FIELD = "file_index_json"
+JOB_FILE_SUBDIRS = ("stems", "beat_analysis", "transcription", "results", "")
+
+
+def output_file_candidates(job_data: Dict[str, Any]) -> List[tuple]:
+    """List the (download link key, path) pairs a job's hash points at."""
+    candidates = []
+    for key, path_field, status_field in OUTPUT_FILE_SOURCES:
+        path = job_data.get(path_field)
+        if path and (status_field is None or job_data.get(status_field) == "completed"):
+            candidates.append((key, path))
+    return candidates
+
+
+# Atomically add a delta to a job's progress, clamped to 0-100 on the server
+BUMP_PROGRESS_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return false
+end
+local p = redis.call('HINCRBY', KEYS[1], 'progress', ARGV[1])
+if p > 100 then
+    redis.call('HSET', KEYS[1], 'progress', 100)
+    p = 100
+elseif p < 0 then
+    redis.call('HSET', KEYS[1], 'progress', 0)
+    p = 0
+end
+redis.call('HSET', KEYS[1], 'updated_at', ARGV[2])
+redis.call('HDEL', KEYS[1], ARGV[3])
+return p
+"""
+
 
 class JobStatus(str, Enum):
     """Job status enumeration."""
@@ -27,6 +100,10 @@ class JobStatus(str, Enum):
     COMPLETED = "COMPLETED"
     FAILED = "FAILED"
     EXPIRED = "EXPIRED"
+    
+    def __str__(self) -> str:
+        # Format as the raw value so keys like f"jobs:status:{status}" need no .value lookup
+        return self._value_
 
 
 class ProcessingStep(str, Enum):
@@ -39,6 +116,9 @@ class ProcessingStep(str, Enum):
     BEAT_ANALYSIS = "BEAT_ANALYSIS"
     FINALIZATION = "FINALIZATION"
     COMPLETED = "COMPLETED"
+    
+    def __str__(self) -> str:
+        return self._value_
 
 
 class JobData(BaseModel):
@@ -52,6 +132,8 @@ class JobData(BaseModel):
     original_filename: Optional[str] = Field(default=None, description="Original uploaded filename")
     file_size: Optional[int] = Field(default=None, description="File size in bytes")
     file_path: Optional[str] = Field(default=None, description="Path to uploaded file")
+    job_dir: Optional[str] = Field(default=None, description="Canonical (resolved) job directory")
+    file_hash: Optional[str] = Field(default=None, description="SHA-256 of the uploaded file")
     
     # Processing results
     stems: Dict[str, str] = Field(default_factory=dict, description="Paths to stem files")
@@ -73,6 +155,31 @@ class JobData(BaseModel):
     
     # Task tracking
     task_id: Optional[str] = Field(default=None, description="Celery task ID for background processing")
+    
+    def to_redis_mapping(self) -> Dict[str, str]:
+        """
+        Build the mapping stored in the job hash directly from the model.
+        
+        Skips model_dump() so internal updates avoid an intermediate dict copy.
+        None-valued fields are left out; callers HDEL them instead.
+        """
+        mapping = {}
+        for name in type(self).model_fields:
+            value = getattr(self, name)
+            if value is None:
+                continue
+            if isinstance(value, dict):
+                mapping[name] = json.dumps(value)
+            else:
+                # Enums format as their raw value
+                mapping[name] = str(value)
+        return mapping
+
+
+JOB_FIELDS = tuple(JobData.model_fields)
+
+# Stored values that mean "unset" in hashes written by older code
+UNSET_VALUES = ("None", "")
 
 
 class JobManager:
@@ -80,6 +187,10 @@ class JobManager:
     
     def __init__(self):
         self.redis = redis_client
+        # Registered scripts run via EVALSHA and reload themselves if the script cache is flushed
+        self._bump_progress = self.redis.client.register_script(BUMP_PROGRESS_SCRIPT)
+        # When each job key last had its TTL re-armed (bounded, entries age out)
+        self._last_expire: TTLCache = TTLCache(maxsize=4096, ttl=300)
     
     def generate_job_id(self) -> str:
         """Generate a unique job ID."""
@@ -109,21 +220,37 @@ class JobManager:
             logger.error("Failed to save job to Redis", job_id=job_id)
             raise RuntimeError(f"Failed to create job {job_id}")
     
-    def save_job(self, job_data: JobData) -> bool:
-        """Save job data to Redis."""
+    def save_job(self, job_data: JobData, previous_status: Optional[JobStatus] = None) -> bool:
+        """
+        Save job data to Redis.
+        
+        Callers that changed the job's status pass the status it had when read, so the
+        job leaves that status index in the same round trip.
+        """
         try:
             job_data.updated_at = time.time()
             
-            # Convert to dict for storage
-            job_dict = job_data.model_dump()
+            # Convert for storage, leaving unset optional fields out of the hash
+            mapping = job_data.to_redis_mapping()
+            cleared = [k for k in JOB_FIELDS if k not in mapping]
+            cleared.append(STATUS_JSON_FIELD)
             
-            # Store job data as hash
+            # Store job data as hash and set expiration (cleanup after job timeout + buffer)
+            # in a single round trip. The TTL is hours long, so only re-arm it
+            # when the last refresh is older than EXPIRE_REFRESH_INTERVAL.
             job_key = f"job:{job_data.job_id}"
-            success = self.redis.hset(job_key, job_dict)
-            
-            # Set expiration (cleanup after job timeout + buffer)
-            expiry_seconds = settings.job_timeout + settings.cleanup_interval
-            self.redis.expire(job_key, expiry_seconds)
+            now = time.time()
+            refresh_expire = now - self._last_expire.get(job_data.job_id, 0) > EXPIRE_REFRESH_INTERVAL
+            pipe = self.redis.pipeline()
+            pipe.hset(job_key, mapping=mapping)
+            pipe.hdel(job_key, *cleared)
+            if refresh_expire:
+                pipe.expire(job_key, settings.job_timeout + settings.cleanup_interval)
+            if previous_status is not None and previous_status != job_data.status:
+                pipe.lrem(f"jobs:status:{previous_status}", 1, job_data.job_id)
+            pipe.execute()
+            if refresh_expire:
+                self._last_expire[job_data.job_id] = now
             
             # Only add to indices if this is a new job (not already in the index)
             # Use a simpler approach - check if job exists in a set instead
@@ -133,17 +260,10 @@ class JobManager:
                 self.redis.client.sadd(job_exists_key, job_data.job_id)
             
             # Always add to status index (remove duplicates later if needed)
-            # Handle case where status might be None
-            if job_data.status is not None and hasattr(job_data.status, 'value'):
-                status_key = f"jobs:status:{job_data.status.value}"
-                self.redis.lpush(status_key, job_data.job_id)
-            else:
-                logger.warning("Job status is None or invalid, skipping status index", job_id=job_data.job_id)
+            self.redis.lpush(f"jobs:status:{job_data.status}", job_data.job_id)
             
-            # Check if job exists in Redis to determine success
-            # hset returns 0 when updating existing fields with same values
-            job_exists = self.redis.exists(job_key)
-            return job_exists
+            # The pipeline raises on failure, so reaching here means the hash was written
+            return True
             
         except Exception as e:
             logger.error("Failed to save job", job_id=job_data.job_id, error=str(e), exc_info=True)
@@ -152,60 +272,51 @@ class JobManager:
     def get_job(self, job_id: str) -> Optional[JobData]:
         """Get job data by ID."""
         try:
+            # The job hash also carries per-stage fields written by the tasks;
+            # fetch only the model's own fields instead of the whole hash
             job_key = f"job:{job_id}"
-            job_dict = self.redis.hgetall(job_key)
+            values = self.redis.client.hmget(job_key, JOB_FIELDS)
+            job_dict = {k: v for k, v in zip(JOB_FIELDS, values) if v is not None}
             
             if not job_dict:
                 return None
             
-            # Convert Redis string values to appropriate types
-            # Handle numeric fields
-            for field in ['progress', 'file_size', 'created_at', 'updated_at', 'started_at', 'completed_at']:
-                if field in job_dict and job_dict[field] is not None and job_dict[field] != 'None':
-                    if field in ['progress', 'file_size']:
-                        job_dict[field] = int(job_dict[field])
-                    else:
-                        job_dict[field] = float(job_dict[field])
-                elif field in job_dict and job_dict[field] == 'None':
-                    job_dict[field] = None
+            # Hashes written before unset fields were left out store them as "None" or "";
+            # those fall back to the model defaults like missing keys
+            job_dict = {k: v for k, v in job_dict.items() if v not in UNSET_VALUES}
+            
+            # Convert Redis string values to appropriate types.
+            # Unset optional fields are not stored, so missing keys fall back to model defaults.
+            for field in ['progress', 'file_size']:
+                if field in job_dict:
+                    job_dict[field] = int(job_dict[field])
+            
+            for field in ['created_at', 'updated_at', 'started_at', 'completed_at']:
+                if field in job_dict:
+                    job_dict[field] = float(job_dict[field])
             
             # Handle JSON fields
-            import json
             for field in ['stems', 'lyrics', 'beats', 'processing_config']:
-                if field in job_dict and job_dict[field] is not None and job_dict[field] != 'None':
+                if field in job_dict:
                     try:
                         job_dict[field] = json.loads(job_dict[field])
                     except (json.JSONDecodeError, TypeError):
-                        job_dict[field] = {} if field in ['stems', 'processing_config'] else None
-                elif field in job_dict and job_dict[field] == 'None':
-                    job_dict[field] = {} if field in ['stems', 'processing_config'] else None
+                        del job_dict[field]
             
             # Handle enum fields - convert string values back to enums
-            if 'status' in job_dict and job_dict['status'] and job_dict['status'] != 'None' and job_dict['status'] is not None:
+            if 'status' in job_dict:
                 try:
                     job_dict['status'] = JobStatus(job_dict['status'])
                 except ValueError:
                     # Fallback to QUEUED if invalid status
                     job_dict['status'] = JobStatus.QUEUED
-            else:
-                # Default to QUEUED if status is None, "None", or missing
-                job_dict['status'] = JobStatus.QUEUED
-            
-            if 'current_step' in job_dict and job_dict['current_step'] and job_dict['current_step'] != 'None' and job_dict['current_step'] is not None:
-                try:
-                    job_dict['current_step'] = ProcessingStep(job_dict['current_step'])
-                except ValueError:
-                    job_dict['current_step'] = None
-            else:
-                job_dict['current_step'] = None
             
-            if 'error_step' in job_dict and job_dict['error_step'] and job_dict['error_step'] != 'None' and job_dict['error_step'] is not None:
-                try:
-                    job_dict['error_step'] = ProcessingStep(job_dict['error_step'])
-                except ValueError:
-                    job_dict['error_step'] = None
-            else:
-                job_dict['error_step'] = None
+            for field in ['current_step', 'error_step']:
+                if field in job_dict:
+                    try:
+                        job_dict[field] = ProcessingStep(job_dict[field])
+                    except ValueError:
+                        del job_dict[field]
             
             # Convert back to JobData model
             return JobData(**job_dict)
@@ -218,17 +329,25 @@ class JobManager:
                           progress: Optional[int] = None,
                           current_step: Optional[ProcessingStep] = None,
                           error_message: Optional[str] = None) -> bool:
-        """Update job status and progress."""
+        """Update job status and progress; nothing is written when the job would not change."""
         try:
             job_data = self.get_job(job_id)
             if not job_data:
                 logger.warning("Job not found for status update", job_id=job_id)
                 return False
             
-            # Remove from old status index (if status is changing)
-            if job_data.status != status and job_data.status is not None:
-                old_status_key = f"jobs:status:{job_data.status.value}"
-                self.redis.client.lrem(old_status_key, 1, job_id)
+            # Progress-only callers pass no status; keep the current one
+            if status is None:
+                status = job_data.status
+            
+            if (error_message is None
+                    and status == job_data.status
+                    and (progress is None or min(100, max(0, progress)) == job_data.progress)
+                    and (current_step is None or current_step == job_data.current_step)):
+                return True
+            
+            # Leave the old status index as part of the save
+            previous_status = job_data.status
             
             # Update job data
             job_data.status = status
@@ -254,10 +373,9 @@ class JobManager:
                     job_data.progress = 100
             
             # Save updated job data
-            if self.save_job(job_data):
-                status_value = status.value if status and hasattr(status, 'value') else str(status)
+            if self.save_job(job_data, previous_status):
                 logger.log_job_event(job_id, "status_updated", 
-                                    status=status_value, progress=job_data.progress)
+                                    status=str(status), progress=job_data.progress)
                 return True
             
             return False
@@ -266,6 +384,38 @@ class JobManager:
             logger.error("Failed to update job status", job_id=job_id, error=str(e), exc_info=True)
             return False
     
+    def patch_job(self, job_id: str, previous_status: Optional[JobStatus] = None,
+                  **fields: Any) -> bool:
+        """
+        Set JobData fields on an existing job in one round trip, without reading it first.
+        
+        A ``status`` field also adds the job to that status index; callers that know the
+        job's previous status pass it so the old index entry is removed.
+        """
+        try:
+            job_key = f"job:{job_id}"
+            mapping = {
+                name: json.dumps(value) if isinstance(value, dict) else str(value)
+                for name, value in fields.items()
+                if value is not None
+            }
+            mapping['updated_at'] = str(time.time())
+            
+            pipe = self.redis.client.pipeline()
+            pipe.hset(job_key, mapping=mapping)
+            pipe.hdel(job_key, STATUS_JSON_FIELD)
+            status = fields.get('status')
+            if status is not None:
+                if previous_status is not None and previous_status != status:
+                    pipe.lrem(f"jobs:status:{previous_status}", 1, job_id)
+                pipe.lpush(f"jobs:status:{status}", job_id)
+            pipe.execute()
+            return True
+            
+        except Exception as e:
+            logger.error("Failed to patch job", job_id=job_id, error=str(e))
+            return False
+    
     def update_job_progress(self, job_id: str, progress: int, 
                            current_step: Optional[ProcessingStep] = None) -> bool:
         """Update job progress."""
@@ -274,7 +424,14 @@ class JobManager:
             if not job_data:
                 return False
             
-            job_data.progress = min(100, max(0, progress))
+            # Repeated callbacks often report the same value; skip the write
+            progress = min(100, max(0, progress))
+            if (progress == job_data.progress
+                    and (current_step is None or current_step == job_data.current_step)
+                    and not (job_data.status == JobStatus.QUEUED and progress > 0)):
+                return True
+            
+            job_data.progress = progress
             job_data.updated_at = time.time()
             
             if current_step is not None:
@@ -292,6 +449,16 @@ class JobManager:
             logger.error("Failed to update job progress", job_id=job_id, error=str(e))
             return False
     
+    def bump_progress(self, job_id: str, delta: int) -> Optional[int]:
+        """Add a delta to job progress in a single round trip and return the new value."""
+        try:
+            progress = self._bump_progress(keys=[f"job:{job_id}"], args=[delta, time.time(), STATUS_JSON_FIELD])
+            return int(progress) if progress is not None else None
+            
+        except Exception as e:
+            logger.error("Failed to bump job progress", job_id=job_id, error=str(e))
+            return None
+    
     def update_task_status(self, job_id: str, task_name: str, status: str, 
                           progress: int = 0, error: Optional[str] = None, 
                           **kwargs) -> bool:
@@ -309,12 +476,14 @@ class JobManager:
             if error:
                 task_fields[f"{task_name}_error"] = error
             
-            # Add any additional task-specific fields
+            # Add any additional task-specific fields; unknown values are left unset
+            # rather than stored as the string "None"
             for key, value in kwargs.items():
-                task_fields[f"{task_name}_{key}"] = str(value) if value is not None else None
+                if value is not None:
+                    task_fields[f"{task_name}_{key}"] = str(value)
             
             # Update Redis hash
-            success = self.redis.hset(job_key, task_fields)
+            success = self.redis.hset(job_key, task_fields, clear=(STATUS_JSON_FIELD,))
             
             if success:
                 logger.info("Task status updated", job_id=job_id, task=task_name, status=status, progress=progress)
@@ -327,6 +496,64 @@ class JobManager:
             logger.error("Failed to update task status", job_id=job_id, task=task_name, error=str(e), exc_info=True)
             return False
     
+    def record_output_files(self, job_id: str) -> Optional[List[List[str]]]:
+        """Resolve a job's output files once and store them, with a file name index, on the job hash."""
+        try:
+            job_key = f"job:{job_id}"
+            fields = sorted({f for source in OUTPUT_FILE_SOURCES for f in source[1:] if f} | {"file_path"})
+            job_data = dict(zip(fields, self.redis.hmget(job_key, fields)))
+            
+            output_files = [
+                [key, path] for key, path in output_file_candidates(job_data)
+                if os.path.exists(path)
+            ]
+            
+            # Index every file the download routes could serve; earlier subdirectories win
+            file_index = {}
+            if job_data.get("file_path"):
+                job_dir = os.path.dirname(job_data["file_path"])
+                for subdir in JOB_FILE_SUBDIRS:
+                    try:
+                        with os.scandir(os.path.join(job_dir, subdir)) as entries:
+                            for entry in entries:
+                                if entry.is_file(follow_symlinks=False):
+                                    file_index.setdefault(entry.name, os.path.join(subdir, entry.name))
+                    except OSError:
+                        continue
+            
+            self.redis.hset(job_key, {OUTPUT_FILES_FIELD: output_files, FILE_INDEX_FIELD: file_index})
+            self.clear_results_cache(job_id)
+            
+            logger.info("Output files recorded", job_id=job_id,
+                        file_count=len(output_files), indexed_files=len(file_index))
+            return output_files
+            
+        except Exception as e:
+            logger.error("Failed to record output files", job_id=job_id, error=str(e))
+            return None
+    
+    def clear_results_cache(self, job_id: str) -> None:
+        """Drop a job's pre-rendered results after a change that does not touch updated_at."""
+        self.redis.delete(RESULTS_CACHE_KEY.format(job_id=job_id))
+    
+    def clear_output_files(self, job_id: str) -> bool:
+        """
+        Forget a job's recorded output files after they were removed from disk.
+        
+        The results route then checks the hash's paths on disk again, and the file
+        routes fall back to scanning the (now empty) job directory.
+        """
+        try:
+            pipe = self.redis.client.pipeline()
+            pipe.hdel(f"job:{job_id}", OUTPUT_FILES_FIELD, FILE_INDEX_FIELD, STATUS_JSON_FIELD)
+            pipe.delete(RESULTS_CACHE_KEY.format(job_id=job_id))
+            pipe.execute()
+            return True
+            
+        except Exception as e:
+            logger.error("Failed to clear output files", job_id=job_id, error=str(e))
+            return False
+    
     def set_job_results(self, job_id: str, 
                        stems: Optional[Dict[str, str]] = None,
                        lyrics: Optional[Dict[str, Any]] = None,
@@ -363,16 +590,14 @@ class JobManager:
             
             # Remove from indices
             self.redis.client.lrem("jobs:all", 1, job_id)
-            if job_data.status is not None:
-                status_key = f"jobs:status:{job_data.status.value}"
-                self.redis.client.lrem(status_key, 1, job_id)
+            self.redis.client.lrem(f"jobs:status:{job_data.status}", 1, job_id)
             
             # Remove from exists set
             self.redis.client.srem("jobs:exists", job_id)
             
-            # Delete job data
+            # Delete job data and its cached results
             job_key = f"job:{job_id}"
-            self.redis.delete(job_key)
+            self.redis.delete(job_key, RESULTS_CACHE_KEY.format(job_id=job_id))
             
             logger.info("Job deleted", job_id=job_id)
             return True
@@ -385,7 +610,7 @@ class JobManager:
         """List jobs, optionally filtered by status."""
         try:
             if status:
-                job_ids = self.redis.client.lrange(f"jobs:status:{status.value}", 0, limit - 1)
+                job_ids = self.redis.client.lrange(f"jobs:status:{status}", 0, limit - 1)
             else:
                 job_ids = self.redis.client.lrange("jobs:all", 0, limit - 1)
             
@@ -433,8 +658,8 @@ class JobManager:
             }
             
             for status in JobStatus:
-                count = self.redis.llen(f"jobs:status:{status.value}")
-                stats["by_status"][status.value] = count
+                count = self.redis.llen(f"jobs:status:{status}")
+                stats["by_status"][str(status)] = count
             
             return stats
             
@@ -0,0 +1,11 @@
+"""
+Shared FastAPI dependencies for the Karaoke Backend API routes.
+"""
+
+from fastapi import Request
+from redis.asyncio import Redis
+
+
+async def get_async_redis(request: Request) -> Redis:
+    """FastAPI dependency returning the application's asyncio Redis client (see app.py lifespan)."""
+    return request.app.state.redis
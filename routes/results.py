@@ -5,14 +5,23 @@ Handles job results retrieval and file serving.
 
 import os
 import json
+import time
+import hashlib
+from collections import OrderedDict
+from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, Optional, List
-from fastapi import APIRouter, HTTPException, Response
-from fastapi.responses import FileResponse
+from cachetools.func import ttl_cache
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
+from redis.asyncio import Redis
 
-from database.redis_client import get_redis_client
-from models.job import JobStatus
+from database.redis_client import RedisClient
+from models.job import (
+    JobStatus, OUTPUT_FILES_FIELD, RESULTS_CACHE_KEY, RESULTS_CACHE_TTL, output_file_candidates
+)
+from routes.dependencies import get_async_redis
 from utils.logger import get_logger
 
 logger = get_logger("results")
@@ -26,7 +35,7 @@ class StemSeparationResults(BaseModel):
     bass_path: Optional[str] = None
     other_path: Optional[str] = None
     processing_time: Optional[float] = None
-    separation_model: Optional[str] = None
+    separation_model: Optional[str] = "htdemucs"
 
 
 class TranscriptionResults(BaseModel):
@@ -110,8 +119,224 @@ class JobResults(BaseModel):
     download_links: Optional[Dict[str, str]] = None
 
 
+# Metadata fields stored as numbers; every other metadata field is a string
+METADATA_INT_FIELDS = frozenset({
+    'year', 'track', 'tracktotal', 'disc', 'bitrate', 'sample_rate', 'channels',
+    'filesize', 'cover_image_size', 'cover_image_width', 'cover_image_height'
+})
+METADATA_FLOAT_FIELDS = frozenset({'duration'})
+
+# (AudioMetadata field, job hash key) pairs; metadata is stored with a "metadata_" prefix
+METADATA_KEYS = tuple((field, f"metadata_{field}") for field in AudioMetadata.model_fields)
+
+# Job statuses whose results can be served
+_COMPLETED = frozenset({'COMPLETED', 'completed', 'completed_with_errors'})
+
+# Per-stage status value marking a finished stage
+STAGE_COMPLETED = 'completed'
+
+
+# Stages reported in the results summary
+SUMMARY_STAGES = ("stem_separation", "transcription", "beat_analysis")
+
+# Summary key metrics and their converters; a converter of None passes the value through
+SUMMARY_METRICS = {
+    "tempo_bpm": float,
+    "beat_count": int,
+    "time_signature": None,
+    "transcription_language": None,
+}
+
+# Job hash fields consumed by get_job_results_summary
+SUMMARY_FIELDS = (
+    "status", "progress", "audio_duration",
+    *(f"{stage}_status" for stage in SUMMARY_STAGES),
+    *SUMMARY_METRICS,
+)
+
+
+# Core job fields, read positionally at the start of every results fetch
+CORE_RESULT_FIELDS = (
+    "progress", "created_at", "updated_at",
+    "original_filename", "audio_duration", "file_size",
+)
+
+# Job hash fields consumed by get_job_results
+RESULT_FIELDS = (
+    *CORE_RESULT_FIELDS,
+    # Stem separation
+    "stem_separation_status", "stem_separation_vocals_path", "stem_separation_drums_path",
+    "stem_separation_bass_path", "stem_separation_other_path",
+    "stem_separation_processing_time", "stem_separation_model",
+    # Transcription
+    "transcription_status", "transcription_path", "transcription_language",
+    "transcription_word_count", "transcription_processing_time", "transcription_confidence",
+    # Beat analysis
+    "beat_analysis_status", "beat_analysis_tempo_bpm", "beat_analysis_beat_count",
+    "beat_analysis_time_signature", "beat_analysis_beat_confidence",
+    "beat_analysis_rhythm_regularity", "beat_analysis_processing_time",
+    "beat_analysis_audio_duration", "beat_analysis_beat_interval",
+    "beat_analysis_onset_count", "beat_analysis_onset_density",
+    "beat_analysis_rhythm_complexity", "beat_analysis_tempo_confidence",
+    "beat_analysis_has_strong_beat", "beat_analysis_json", "beats_json", "onsets_json",
+    # Audio metadata
+    *(key for _, key in METADATA_KEYS),
+    # Output files resolved by the worker on completion
+    OUTPUT_FILES_FIELD,
+)
+
+
+def _to_int(value) -> Optional[int]:
+    """Convert a stored value to int; None for empty, 'None' or malformed values."""
+    if not value or value == 'None':
+        return None
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def _to_float(value) -> Optional[float]:
+    """Convert a stored value to float; None for empty, 'None' or malformed values."""
+    if not value or value == 'None':
+        return None
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+_TRUTHY = frozenset({'1', 'true', 'True', 'TRUE', 'yes'})
+
+
+def _to_bool(value) -> Optional[bool]:
+    """Convert a stored flag ('1'/'0', 'True'/'False', or an already decoded value) to a boolean."""
+    if value is None or value == 'None':
+        return None
+    return value is True or value == 1 or value in _TRUTHY
+
+
+# (model field, job hash field, converter) tables for the per-stage results.
+# A converter of None passes the stored value through unchanged.
+STEM_SEPARATION_SCHEMA = (
+    ("vocals_path", "stem_separation_vocals_path", None),
+    ("drums_path", "stem_separation_drums_path", None),
+    ("bass_path", "stem_separation_bass_path", None),
+    ("other_path", "stem_separation_other_path", None),
+    ("processing_time", "stem_separation_processing_time", _to_float),
+    ("separation_model", "stem_separation_model", None),
+)
+
+TRANSCRIPTION_SCHEMA = (
+    ("transcription_path", "transcription_path", None),
+    ("language", "transcription_language", None),
+    ("word_count", "transcription_word_count", _to_int),
+    ("processing_time", "transcription_processing_time", _to_float),
+    ("confidence", "transcription_confidence", _to_float),
+)
+
+BEAT_ANALYSIS_SCHEMA = (
+    ("tempo_bpm", "beat_analysis_tempo_bpm", _to_float),
+    ("beat_count", "beat_analysis_beat_count", _to_int),
+    ("time_signature", "beat_analysis_time_signature", None),
+    ("beat_confidence", "beat_analysis_beat_confidence", _to_float),
+    ("rhythm_regularity", "beat_analysis_rhythm_regularity", _to_float),
+    ("processing_time", "beat_analysis_processing_time", _to_float),
+    ("audio_duration", "beat_analysis_audio_duration", _to_float),
+    ("beat_interval", "beat_analysis_beat_interval", _to_float),
+    ("onset_count", "beat_analysis_onset_count", _to_int),
+    ("onset_density", "beat_analysis_onset_density", _to_float),
+    ("rhythm_complexity", "beat_analysis_rhythm_complexity", None),
+    ("tempo_confidence", "beat_analysis_tempo_confidence", _to_float),
+    ("has_strong_beat", "beat_analysis_has_strong_beat", _to_bool),
+    ("analysis_json", "beat_analysis_json", None),
+    ("beats_json", "beats_json", None),
+    ("onsets_json", "onsets_json", None),
+)
+
+
+def _parse_section(job_data: Dict[str, Any], schema) -> Dict[str, Any]:
+    """Build model keyword arguments from job hash values using a schema table."""
+    values = {}
+    for field, key, convert in schema:
+        value = job_data.get(key)
+        if value:
+            values[field] = convert(value) if convert else value
+    return values
+
+
+# In-process LRU of rendered results for completed jobs:
+# job_id -> (updated_at, headers, body, expires_at). Every entry expires; partial
+# results sooner. A hit is only served after Redis confirms it is still current.
+RESULTS_MEMO_SIZE = 1024
+RESULTS_MEMO_TTL = 300
+RESULTS_MEMO_PARTIAL_TTL = 60
+_results_memo: "OrderedDict[str, tuple]" = OrderedDict()
+
+
+def _memo_get(job_id: str) -> Optional[tuple]:
+    """Return the memoized (updated_at, headers, body) for a job, or None if absent or expired."""
+    entry = _results_memo.get(job_id)
+    if entry is None:
+        return None
+    updated_at, headers, body, expires_at = entry
+    if time.monotonic() > expires_at:
+        del _results_memo[job_id]
+        return None
+    _results_memo.move_to_end(job_id)
+    return updated_at, headers, body
+
+
+def _memo_put(job_id: str, status: str, updated_at: str, headers: Dict[str, str], body: str) -> None:
+    """Memoize a rendered result, evicting the least recently used entries."""
+    ttl = RESULTS_MEMO_PARTIAL_TTL if status == 'completed_with_errors' else RESULTS_MEMO_TTL
+    _results_memo[job_id] = (updated_at, headers, body, time.monotonic() + ttl)
+    _results_memo.move_to_end(job_id)
+    while len(_results_memo) > RESULTS_MEMO_SIZE:
+        _results_memo.popitem(last=False)
+
+
+def _cache_headers(body: str) -> Dict[str, str]:
+    """
+    Build ETag and Cache-Control headers for a rendered results body.
+    The ETag hashes the body itself, so any change to the results changes it, including
+    file cleanup, which leaves updated_at alone; caches must revalidate on every use.
+    """
+    digest = hashlib.blake2b(body.encode(), digest_size=16).hexdigest()
+    return {"ETag": f'"{digest}"', "Cache-Control": "no-cache"}
+
+
+def _results_response(request: Request, body: str, cache_headers: Dict[str, str]) -> Response:
+    """Send a rendered results body, or an empty 304 when the client already holds it."""
+    if request.headers.get("if-none-match") == cache_headers["ETag"]:
+        return Response(status_code=304, headers=cache_headers)
+    return Response(content=body, media_type="application/json", headers=cache_headers)
+
+
+@ttl_cache(maxsize=1024, ttl=5)
+def _list_dir(directory: str) -> frozenset:
+    """List the full paths of the files in a directory, cached briefly to absorb polling bursts."""
+    try:
+        with os.scandir(directory or ".") as entries:
+            # is_file() uses the cached dirent type, so directories drop out without a stat
+            return frozenset(
+                os.path.join(directory, entry.name) for entry in entries if entry.is_file()
+            )
+    except OSError:
+        return frozenset()  # Missing or unreadable directory: none of its files exist
+
+
+def _existing_paths(paths) -> set:
+    """Return the subset of paths that exist, reading each parent directory once."""
+    paths = set(paths)
+    existing = set()
+    for directory in {os.path.dirname(path) for path in paths}:
+        existing |= _list_dir(directory)
+    return existing & paths
+
+
 @router.get("/results/{job_id}", response_model=JobResults)
-async def get_job_results(job_id: str):
+async def get_job_results(job_id: str, request: Request, redis: Redis = Depends(get_async_redis)):
     """
     Get comprehensive job results and processed files.
     
@@ -124,189 +349,140 @@ async def get_job_results(job_id: str):
     Raises:
         HTTPException: 404 if job not found, 409 if job not completed, 500 for internal errors
     """
+    log = logger.bind(job_id=job_id)
     try:
-        logger.info("Getting job results", job_id=job_id)
-        
-        with get_redis_client() as redis_client:
-            # Check if job exists
-            job_exists = redis_client.exists(f"job:{job_id}")
-            if not job_exists:
-                logger.warning("Job not found", job_id=job_id)
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Job {job_id} not found"
-                )
-            
-            # Get all job data
-            job_data = redis_client.hgetall(f"job:{job_id}")
-            
-            if not job_data:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Job {job_id} data not found"
-                )
-        
-        # Check if job is completed
-        status = job_data.get('status', 'unknown')
-        if status not in ['COMPLETED', 'completed', 'completed_with_errors']:
-            logger.warning("Job not completed", job_id=job_id, status=status)
+        log.info("Getting job results")
+        
+        cache_key = RESULTS_CACHE_KEY.format(job_id=job_id)
+        job_key = f"job:{job_id}"
+        
+        # Repeat fetches of a completed job are answered from memory once two small reads
+        # confirm the job and its cached results are unchanged. Deletion, expiry, file
+        # cleanup and any later write all fail the check and drop the entry.
+        memo = _memo_get(job_id)
+        if memo:
+            memo_updated_at, cache_headers, body = memo
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.hget(job_key, "updated_at")
+                pipe.hget(cache_key, "updated_at")
+                job_updated_at, cache_updated_at = await pipe.execute()
+            if job_updated_at is not None and job_updated_at == cache_updated_at == memo_updated_at:
+                return _results_response(request, body, cache_headers)
+            _results_memo.pop(job_id, None)
+        
+        # One round trip for the rendered payload and the fields the ETag depends on
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.hmget(cache_key, ("updated_at", "body"))
+            pipe.hmget(job_key, ("status", "updated_at"))
+            (cached_updated_at, cached), (current_status, updated_at) = await pipe.execute()
+        
+        # The rendered payload only stands while the job has not been written since
+        if cached_updated_at != (updated_at or ""):
+            cached = None
+        
+        # Every saved job has a status, so a missing one means the job does not exist
+        status = current_status
+        if status is None:
+            log.warning("Job not found")
+            raise HTTPException(
+                status_code=404,
+                detail=f"Job {job_id} not found"
+            )
+        
+        # In-progress polls stop here, before any result fields are fetched or parsed
+        if status not in _COMPLETED:
+            log.warning("Job not completed", status=status)
             raise HTTPException(
                 status_code=409,
                 detail=f"Job {job_id} is not completed yet. Current status: {status}"
             )
         
+        if cached:
+            log.info("Job results served from cache")
+            cache_headers = _cache_headers(cached)
+            _memo_put(job_id, status, cached_updated_at, cache_headers, cached)
+            return _results_response(request, cached, cache_headers)
+        
+        # Fetch only the fields used below
+        values = await redis.hmget(job_key, RESULT_FIELDS)
+        
+        # Core fields unpack straight into locals; the per-stage fields go through the parser
+        core_count = len(CORE_RESULT_FIELDS)
+        (progress_raw, created_raw, updated_raw,
+         original_filename, audio_duration_raw, file_size_raw) = values[:core_count]
+        job_data = RedisClient.parse_hash(
+            {k: v for k, v in zip(RESULT_FIELDS[core_count:], values[core_count:]) if v is not None}
+        )
+        
         # Parse basic information
-        progress = int(job_data.get('progress', 0))
-        
-        # Convert timestamps to ISO format strings
-        created_at = None
-        completed_at = None
-        
-        if job_data.get('created_at'):
-            try:
-                from datetime import datetime
-                created_timestamp = float(job_data.get('created_at'))
-                created_at = datetime.fromtimestamp(created_timestamp).isoformat()
-            except (ValueError, TypeError):
-                pass
-                
-        if job_data.get('updated_at'):
-            try:
-                from datetime import datetime
-                completed_timestamp = float(job_data.get('updated_at'))
-                completed_at = datetime.fromtimestamp(completed_timestamp).isoformat()
-            except (ValueError, TypeError):
-                pass
-        
-        # Calculate total processing time
-        total_processing_time = None
-        if created_at and completed_at:
-            try:
-                from datetime import datetime
-                created_dt = datetime.fromisoformat(created_at)
-                completed_dt = datetime.fromisoformat(completed_at)
-                total_processing_time = (completed_dt - created_dt).total_seconds()
-            except:
-                pass
+        progress = int(progress_raw or 0)
+        
+        # Work from the raw epoch timestamps; ISO strings are only for the response
+        try:
+            created_ts = float(created_raw or 0)
+            updated_ts = float(updated_raw or 0)
+        except (ValueError, TypeError):
+            created_ts = updated_ts = 0.0
+        
+        created_at = datetime.fromtimestamp(created_ts).isoformat() if created_ts else None
+        completed_at = datetime.fromtimestamp(updated_ts).isoformat() if updated_ts else None
+        total_processing_time = updated_ts - created_ts if created_ts and updated_ts else None
         
         # Get original file information
-        original_filename = job_data.get('original_filename')
-        audio_duration = float(job_data.get('audio_duration', 0)) if job_data.get('audio_duration') else None
-        file_size = int(job_data.get('file_size', 0)) if job_data.get('file_size') else None
-        
-        # Build audio metadata
-        audio_metadata = None
-        metadata_fields = {k: v for k, v in job_data.items() if k.startswith('metadata_')}
-        if metadata_fields:
-            # Remove the 'metadata_' prefix and convert types
-            metadata_values = {}
-            for key, value in metadata_fields.items():
-                field_name = key[9:]  # Remove 'metadata_' prefix
-                
-                # Convert to appropriate types
-                if field_name in ['year', 'track', 'tracktotal', 'disc', 'bitrate', 'sample_rate', 'channels', 'filesize', 'cover_image_size', 'cover_image_width', 'cover_image_height']:
-                    try:
-                        metadata_values[field_name] = int(value) if value and value != 'None' else None
-                    except (ValueError, TypeError):
-                        metadata_values[field_name] = None
-                elif field_name in ['duration']:
-                    try:
-                        metadata_values[field_name] = float(value) if value and value != 'None' else None
-                    except (ValueError, TypeError):
-                        metadata_values[field_name] = None
-                else:
-                    # String fields - ensure they are strings
-                    if value and value != 'None':
-                        metadata_values[field_name] = str(value)
-                    else:
-                        metadata_values[field_name] = None
+        audio_duration = _to_float(audio_duration_raw)
+        file_size = _to_int(file_size_raw)
+        
+        # Build audio metadata from the known (field, hash key) pairs; no prefix scanning
+        metadata_values = {}
+        for field_name, key in METADATA_KEYS:
+            value = job_data.get(key)
+            if value is None:
+                continue
             
-            audio_metadata = AudioMetadata(**metadata_values)
+            # Convert to appropriate types
+            if field_name in METADATA_INT_FIELDS:
+                metadata_values[field_name] = _to_int(value)
+            elif field_name in METADATA_FLOAT_FIELDS:
+                metadata_values[field_name] = _to_float(value)
+            else:
+                # String fields - ensure they are strings
+                metadata_values[field_name] = str(value) if value and value != 'None' else None
+        
+        audio_metadata = AudioMetadata.model_construct(**metadata_values) if metadata_values else None
         
-        # Build stem separation results
+        # Build per-stage results from their schema tables
         stem_separation = None
-        if job_data.get('stem_separation_status') == 'completed':
-            stem_separation = StemSeparationResults(
-                vocals_path=job_data.get('stem_separation_vocals_path'),
-                drums_path=job_data.get('stem_separation_drums_path'),
-                bass_path=job_data.get('stem_separation_bass_path'),
-                other_path=job_data.get('stem_separation_other_path'),
-                processing_time=float(job_data.get('stem_separation_processing_time', 0)) if job_data.get('stem_separation_processing_time') else None,
-                separation_model=job_data.get('stem_separation_model', 'htdemucs')
-            )
+        if job_data.get('stem_separation_status') == STAGE_COMPLETED:
+            stem_separation = StemSeparationResults.model_construct(**_parse_section(job_data, STEM_SEPARATION_SCHEMA))
         
-        # Build transcription results
         transcription = None
-        if job_data.get('transcription_status') == 'completed':
-            transcription = TranscriptionResults(
-                transcription_path=job_data.get('transcription_path'),
-                language=job_data.get('transcription_language'),
-                word_count=int(job_data.get('transcription_word_count', 0)) if job_data.get('transcription_word_count') else None,
-                processing_time=float(job_data.get('transcription_processing_time', 0)) if job_data.get('transcription_processing_time') else None,
-                confidence=float(job_data.get('transcription_confidence', 0)) if job_data.get('transcription_confidence') else None
-            )
+        if job_data.get('transcription_status') == STAGE_COMPLETED:
+            transcription = TranscriptionResults.model_construct(**_parse_section(job_data, TRANSCRIPTION_SCHEMA))
         
-        # Build beat analysis results
         beat_analysis = None
-        if job_data.get('beat_analysis_status') == 'completed':
-            beat_analysis = BeatAnalysisResults(
-                tempo_bpm=float(job_data.get('beat_analysis_tempo_bpm', 0)) if job_data.get('beat_analysis_tempo_bpm') else None,
-                beat_count=int(job_data.get('beat_analysis_beat_count', 0)) if job_data.get('beat_analysis_beat_count') else None,
-                time_signature=job_data.get('beat_analysis_time_signature'),
-                beat_confidence=float(job_data.get('beat_analysis_beat_confidence', 0)) if job_data.get('beat_analysis_beat_confidence') else None,
-                rhythm_regularity=float(job_data.get('beat_analysis_rhythm_regularity', 0)) if job_data.get('beat_analysis_rhythm_regularity') else None,
-                processing_time=float(job_data.get('beat_analysis_processing_time', 0)) if job_data.get('beat_analysis_processing_time') else None,
-                audio_duration=float(job_data.get('beat_analysis_audio_duration', 0)) if job_data.get('beat_analysis_audio_duration') else None,
-                beat_interval=float(job_data.get('beat_analysis_beat_interval', 0)) if job_data.get('beat_analysis_beat_interval') else None,
-                onset_count=int(job_data.get('beat_analysis_onset_count', 0)) if job_data.get('beat_analysis_onset_count') else None,
-                onset_density=float(job_data.get('beat_analysis_onset_density', 0)) if job_data.get('beat_analysis_onset_density') else None,
-                rhythm_complexity=job_data.get('beat_analysis_rhythm_complexity'),
-                tempo_confidence=float(job_data.get('beat_analysis_tempo_confidence', 0)) if job_data.get('beat_analysis_tempo_confidence') else None,
-                has_strong_beat=bool(int(job_data.get('beat_analysis_has_strong_beat', 0))) if job_data.get('beat_analysis_has_strong_beat') else None,
-                analysis_json=job_data.get('beat_analysis_json'),
-                beats_json=job_data.get('beats_json'),
-                onsets_json=job_data.get('onsets_json')
-            )
+        if job_data.get('beat_analysis_status') == STAGE_COMPLETED:
+            beat_analysis = BeatAnalysisResults.model_construct(**_parse_section(job_data, BEAT_ANALYSIS_SCHEMA))
+        
+        # Output files as (download link key, path) pairs; jobs finished before the worker
+        # recorded them fall back to checking the hash's paths, one directory read per folder
+        pairs = job_data.get(OUTPUT_FILES_FIELD)
+        if not isinstance(pairs, list):
+            candidates = output_file_candidates(job_data)
+            existing = _existing_paths(path for _, path in candidates)
+            pairs = [(key, path) for key, path in candidates if path in existing]
         
-        # Collect all output files
+        prefix = f"/api/files/{job_id}/"
+        basename = os.path.basename
         output_files = []
         download_links = {}
+        for key, path in pairs:
+            download_links[key] = prefix + basename(path)
+            # The cover image gets a download link but is not listed as an output file
+            if key != "cover_image":
+                output_files.append(path)
         
-        # Add stem files
-        if stem_separation:
-            for stem_type, path in [
-                ('vocals', stem_separation.vocals_path),
-                ('drums', stem_separation.drums_path),
-                ('bass', stem_separation.bass_path),
-                ('other', stem_separation.other_path)
-            ]:
-                if path and os.path.exists(path):
-                    output_files.append(path)
-                    download_links[f"{stem_type}_stem"] = f"/api/files/{job_id}/{os.path.basename(path)}"
-        
-        # Add transcription files
-        if transcription and transcription.transcription_path and os.path.exists(transcription.transcription_path):
-            output_files.append(transcription.transcription_path)
-            download_links["transcription"] = f"/api/files/{job_id}/{os.path.basename(transcription.transcription_path)}"
-        
-        # Add beat analysis files
-        if beat_analysis:
-            for analysis_type, path in [
-                ('analysis', beat_analysis.analysis_json),
-                ('beats', beat_analysis.beats_json),
-                ('onsets', beat_analysis.onsets_json)
-            ]:
-                if path and os.path.exists(path):
-                    output_files.append(path)
-                    download_links[f"beat_{analysis_type}"] = f"/api/files/{job_id}/{os.path.basename(path)}"
-        
-        # Add cover image to download links if available
-        if audio_metadata and audio_metadata.cover_image_path and os.path.exists(audio_metadata.cover_image_path):
-            cover_filename = os.path.basename(audio_metadata.cover_image_path)
-            download_links["cover_image"] = f"/api/files/{job_id}/{cover_filename}"
-        
-        # Build response
-        results = JobResults(
+        # Every value above is already converted to its field type, so skip validation
+        results = JobResults.model_construct(
             job_id=job_id,
             status=status,
             progress=progress,
@@ -324,22 +500,35 @@ async def get_job_results(job_id: str):
             download_links=download_links
         )
         
-        logger.info("Job results retrieved successfully", 
-                   job_id=job_id, 
-                   status=status,
-                   output_files_count=len(output_files),
-                   total_processing_time=total_processing_time)
+        # Render once with Pydantic's serializer; returning the bytes directly skips
+        # FastAPI's response_model revalidation and a second encoding pass
+        rendered = results.model_dump_json()
+        cache_headers = _cache_headers(rendered)
+        
+        # Only completed jobs reach this point; cache the rendered payload for later requests
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.hset(cache_key, mapping={"updated_at": updated_at or "", "body": rendered})
+                pipe.expire(cache_key, RESULTS_CACHE_TTL)
+                await pipe.execute()
+        except Exception as e:
+            log.warning("Failed to cache job results", error=str(e))
+        _memo_put(job_id, status, updated_at or "", cache_headers, rendered)
         
-        return results
+        log.info("Job results retrieved successfully", 
+                status=status,
+                output_files_count=len(output_files),
+                total_processing_time=total_processing_time)
+        
+        return _results_response(request, rendered, cache_headers)
         
     except HTTPException:
         # Re-raise HTTP exceptions
         raise
     except Exception as e:
-        logger.error("Failed to get job results", 
-                    job_id=job_id, 
-                    error=str(e), 
-                    exc_info=True)
+        log.error("Failed to get job results", 
+                  error=str(e), 
+                  exc_info=True)
         raise HTTPException(
             status_code=500,
             detail=f"Internal server error while retrieving job results"
@@ -347,7 +536,7 @@ async def get_job_results(job_id: str):
 
 
 @router.get("/results/{job_id}/summary")
-async def get_job_results_summary(job_id: str):
+async def get_job_results_summary(job_id: str, redis: Redis = Depends(get_async_redis)):
     """
     Get a summary of job results without file paths.
     
@@ -357,48 +546,45 @@ async def get_job_results_summary(job_id: str):
     Returns:
         Summary of processing results and key metrics
     """
+    log = logger.bind(job_id=job_id)
     try:
-        logger.info("Getting job results summary", job_id=job_id)
-        
-        with get_redis_client() as redis_client:
-            # Check if job exists
-            job_exists = redis_client.exists(f"job:{job_id}")
-            if not job_exists:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Job {job_id} not found"
-                )
-            
-            # Get job data
-            job_data = redis_client.hgetall(f"job:{job_id}")
+        log.info("Getting job results summary")
+        
+        # Fetch only the summary fields; no values at all means the job does not exist
+        values = await redis.hmget(f"job:{job_id}", SUMMARY_FIELDS)
+        job_data = {k: v for k, v in zip(SUMMARY_FIELDS, values) if v is not None}
+        
+        if not job_data:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Job {job_id} not found"
+            )
         
         # Build summary
+        audio_duration = job_data.get('audio_duration')
         summary = {
             "job_id": job_id,
             "status": job_data.get('status', 'unknown'),
             "progress": int(job_data.get('progress', 0)),
-            "audio_duration": float(job_data.get('audio_duration', 0)) if job_data.get('audio_duration') else None,
+            "audio_duration": float(audio_duration) if audio_duration else None,
             "processing_completed": {
-                "stem_separation": job_data.get('stem_separation_status') == 'completed',
-                "transcription": job_data.get('transcription_status') == 'completed',
-                "beat_analysis": job_data.get('beat_analysis_status') == 'completed'
+                stage: job_data.get(f"{stage}_status") == STAGE_COMPLETED
+                for stage in SUMMARY_STAGES
             },
             "key_metrics": {
-                "tempo_bpm": float(job_data.get('tempo_bpm', 0)) if job_data.get('tempo_bpm') else None,
-                "beat_count": int(job_data.get('beat_count', 0)) if job_data.get('beat_count') else None,
-                "time_signature": job_data.get('time_signature'),
-                "transcription_language": job_data.get('transcription_language')
+                key: (convert(value) if convert else value) if (value := job_data.get(key)) else None
+                for key, convert in SUMMARY_METRICS.items()
             }
         }
         
-        return summary
+        # Plain JSON-native values, so skip jsonable_encoder and serialize directly
+        return ORJSONResponse(summary)
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error("Failed to get job results summary", 
-                    job_id=job_id, 
-                    error=str(e))
+        log.error("Failed to get job results summary", 
+                  error=str(e))
         raise HTTPException(
             status_code=500,
             detail="Internal server error"
@@ -4,125 +4,393 @@ Handles secure file downloads for processed audio and results.
 """
 
 import os
+import json
+import stat
+import logging
+import threading
 import mimetypes
-from pathlib import Path
-from typing import Optional
-from fastapi import APIRouter, HTTPException, Response, Query
-from fastapi.responses import FileResponse
+from types import MappingProxyType
+from typing import Optional, Tuple
+from email.utils import formatdate
+import aiofiles
+from cachetools import LRUCache, TTLCache
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse
 from fastapi.security.utils import get_authorization_scheme_param
+from redis.asyncio import Redis
 
-from database.redis_client import get_redis_client
+from routes.dependencies import get_async_redis
+from models.job import FILE_INDEX_FIELD, JOB_FILE_SUBDIRS
 from utils.logger import get_logger
 from config import settings
 
 logger = get_logger("static")
 router = APIRouter()
 
+# Load the system MIME tables at import instead of lazily during the first download
+mimetypes.init()
 
-def is_safe_path(basedir: str, path: str) -> bool:
+# Byte ranges (206 responses) are streamed in 1 MiB chunks; Starlette 0.27's
+# FileResponse has no Range support
+STREAM_CHUNK_SIZE = 1 << 20
+
+# Files up to SMALL_FILE_LIMIT are served from memory; the cache holds up to 32 MiB of
+# them keyed by (path, mtime_ns, size), so a rewritten file is never served stale
+SMALL_FILE_LIMIT = 64 << 10
+_SMALL_FILES = LRUCache(maxsize=32 << 20, getsizeof=len)
+
+
+def is_safe_relname(relname: str) -> bool:
     """
-    Check if the requested path is safe (within the base directory).
-    Prevents directory traversal attacks.
+    Check that a client-supplied file name cannot leave the job directory.
+    Pure string checks, so unsafe names are rejected before any Redis or filesystem access.
+    Files are looked up by bare name, so any separator is rejected; every lookup branch
+    then lstats the final path and serves regular files only, never symlinks.
     """
-    try:
-        basedir = os.path.abspath(basedir)
-        path = os.path.abspath(os.path.join(basedir, path))
-        return path.startswith(basedir)
-    except:
-        return False
+    return not (
+        not relname
+        or '/' in relname
+        or '\\' in relname
+        or '\x00' in relname
+        or relname in ('.', '..')
+    )
+
+
+# Extension -> MIME type, frozen at import: the system table (loaded above) with
+# fallbacks for the formats this backend produces when the system lacks them
+_EXT_MIME_TYPES = MappingProxyType({
+    '.wav': 'audio/wav',
+    '.mp3': 'audio/mpeg',
+    '.flac': 'audio/flac',
+    '.m4a': 'audio/mp4',
+    '.json': 'application/json',
+    '.txt': 'text/plain',
+    '.srt': 'text/plain',
+    **{ext.lower(): mime_type for ext, mime_type in mimetypes.types_map.items()}
+})
 
 
 def get_file_mime_type(file_path: str) -> str:
     """Get the MIME type for a file."""
-    mime_type, _ = mimetypes.guess_type(file_path)
+    return _EXT_MIME_TYPES.get(os.path.splitext(file_path)[1].lower(), 'application/octet-stream')
+
+
+def file_cache_headers(file_stat: os.stat_result) -> dict:
+    """ETag, Last-Modified and Cache-Control headers for a job file."""
+    return {
+        "ETag": f'"{file_stat.st_size:x}-{file_stat.st_mtime_ns:x}"',
+        "Last-Modified": formatdate(file_stat.st_mtime, usegmt=True),
+        "Cache-Control": "private, max-age=3600"
+    }
+
+
+def read_small_file(path: str) -> bytes:
+    """Read a whole (small) file."""
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def load_file_index(raw: Optional[str]) -> Optional[dict]:
+    """Decode the job's recorded file name index, or None if it has not been recorded."""
+    if not raw:
+        return None
+    try:
+        file_index = json.loads(raw)
+    except ValueError:
+        return None
+    return file_index if isinstance(file_index, dict) else None
+
+
+def parse_range_header(range_header: str, file_size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range "bytes=" header into an inclusive (start, end) pair.
     
-    # Default MIME types for common audio formats
-    if mime_type is None:
-        ext = os.path.splitext(file_path)[1].lower()
-        audio_types = {
-            '.wav': 'audio/wav',
-            '.mp3': 'audio/mpeg',
-            '.flac': 'audio/flac',
-            '.m4a': 'audio/mp4',
-            '.json': 'application/json',
-            '.txt': 'text/plain',
-            '.srt': 'text/plain'
-        }
-        mime_type = audio_types.get(ext, 'application/octet-stream')
+    Returns None when the header should be ignored (malformed or multi-range) and
+    raises HTTPException 416 when the range cannot be satisfied.
+    """
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    
+    start_str, sep, end_str = spec.strip().partition("-")
+    if not sep:
+        return None
     
-    return mime_type
+    try:
+        if start_str:
+            start = int(start_str)
+            end = int(end_str) if end_str else file_size - 1
+        else:
+            # Suffix range: the last N bytes
+            start = max(file_size - int(end_str), 0)
+            end = file_size - 1
+    except ValueError:
+        return None
+    
+    if start >= file_size or start > end:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{file_size}"}
+        )
+    return start, min(end, file_size - 1)
+
+
+async def iter_file_range(path: str, start: int, length: int, chunk_size: int = STREAM_CHUNK_SIZE):
+    """Yield `length` bytes of a file from `start` in chunks without blocking the event loop."""
+    async with aiofiles.open(path, "rb") as f:
+        await f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = await f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+# Process-local caches; a job's directory and its files' locations do not move.
+# job_id -> (job_dir, file_index) and (job_id, filename) -> resolved path
+_JOB_DIRS = TTLCache(maxsize=10_000, ttl=60)
+_RESOLVED_FILES = TTLCache(maxsize=50_000, ttl=60)
+_RESOLVED_FILES_LOCK = threading.Lock()  # Lookups run in the threadpool
+
+
+# (subdirectory, listing category) pairs in download lookup precedence; a job directory
+# scan is shared by listings and downloads for a few seconds
+JOB_FILE_CATEGORIES = tuple(
+    (subdir, {"stems": "stem_separation", "": "general"}.get(subdir, subdir))
+    for subdir in JOB_FILE_SUBDIRS
+)
+_JOB_SCANS = TTLCache(maxsize=1024, ttl=5)
+_JOB_SCANS_LOCK = threading.Lock()  # Scans run both on the event loop and in the threadpool
+
+
+def scan_job_dir(job_dir: str) -> Tuple[list, dict]:
+    """
+    Read a job directory and its known subdirectories in one pass.
+    
+    Returns:
+        (entries, index): entries are (filename, path, category, size) tuples for every
+        file, and index maps each filename to the path the download lookup resolves to
+    """
+    with _JOB_SCANS_LOCK:
+        cached = _JOB_SCANS.get(job_dir)
+    if cached is not None:
+        return cached
+    
+    entries = []
+    index = {}
+    for subdir, category in JOB_FILE_CATEGORIES:
+        # One handler per directory: a missing or unreadable directory contributes nothing
+        try:
+            with os.scandir(os.path.join(job_dir, subdir)) as directory:
+                for entry in directory:
+                    # The dirent type answers is_file() without a syscall; symlinks are
+                    # never served, so stat() below is the only syscall per file
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                    file_size = entry.stat(follow_symlinks=False).st_size
+                    entries.append((entry.name, entry.path, category, file_size))
+                    index.setdefault(entry.name, entry.path)
+        except OSError:
+            continue
+    
+    result = (entries, index)
+    with _JOB_SCANS_LOCK:
+        _JOB_SCANS[job_dir] = result
+    return result
+
+
+# Where each output type is written; a download tries this one stat before scanning.
+# Output file names are unique across subdirectories, so the guess cannot shadow
+# a same-named file of higher precedence.
+_EXT_SUBDIRS = {
+    '.wav': 'stems',
+    '.mp3': 'stems',
+    '.flac': 'stems',
+    '.json': 'beat_analysis',
+    '.srt': 'transcription',
+    '.txt': 'transcription'
+}
+
+
+def _stat_regular_file(path: str) -> Optional[os.stat_result]:
+    """lstat a path, returning None unless it is a regular file (symlinks are never served)."""
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return None
+    return st if stat.S_ISREG(st.st_mode) else None
+
+
+def invalidate_job_file_cache(job_id: str) -> None:
+    """Drop cached directory and file locations for a job whose files were removed."""
+    job_entry = _JOB_DIRS.pop(job_id, None)
+    if job_entry and job_entry[0]:
+        with _JOB_SCANS_LOCK:
+            _JOB_SCANS.pop(job_entry[0], None)
+    with _RESOLVED_FILES_LOCK:
+        for key in [key for key in _RESOLVED_FILES if key[0] == job_id]:
+            _RESOLVED_FILES.pop(key, None)
+
+
+async def get_job_dir(redis: Redis, job_id: str) -> Tuple[Optional[str], Optional[dict]]:
+    """
+    Return a job's directory and recorded file index, reading Redis only on a cache miss.
+    
+    Raises:
+        HTTPException: 404 if the job does not exist
+    """
+    cached = _JOB_DIRS.get(job_id)
+    if cached is not None:
+        return cached
+    
+    # Only three fields are needed; a missing job reads back as nils
+    original_file_path, job_dir, file_index_raw = await redis.hmget(
+        f"job:{job_id}", ("file_path", "job_dir", FILE_INDEX_FIELD)
+    )
+    if original_file_path is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    
+    # Jobs record their resolved directory at upload; older jobs use the upload's parent
+    entry = (job_dir or os.path.dirname(original_file_path) or None, load_file_index(file_index_raw))
+    _JOB_DIRS[job_id] = entry
+    return entry
+
+
+def locate_job_file(job_id: str, job_dir: str, filename: str,
+                    file_index: Optional[dict]) -> Optional[Tuple[str, os.stat_result]]:
+    """
+    Find a job file and stat it, trying the cached location before searching.
+    The stat doubles as the existence check and feeds the response headers.
+    """
+    key = (job_id, filename)
+    with _RESOLVED_FILES_LOCK:
+        cached_path = _RESOLVED_FILES.get(key)
+    if cached_path is not None:
+        cached_stat = _stat_regular_file(cached_path)
+        if cached_stat is not None:
+            return cached_path, cached_stat
+        with _RESOLVED_FILES_LOCK:
+            _RESOLVED_FILES.pop(key, None)
+    
+    # Completed jobs resolve through their recorded index; others try the directory
+    # the extension points at, then fall back to a directory scan
+    if file_index is not None:
+        subpath = file_index.get(filename)
+        search_path = os.path.join(job_dir, subpath) if subpath else None
+    else:
+        subdir = _EXT_SUBDIRS.get(os.path.splitext(filename)[1].lower())
+        if subdir:
+            guess_path = os.path.join(job_dir, subdir, filename)
+            guess_stat = _stat_regular_file(guess_path)
+            if guess_stat is not None:
+                with _RESOLVED_FILES_LOCK:
+                    _RESOLVED_FILES[key] = guess_path
+                return guess_path, guess_stat
+        search_path = scan_job_dir(job_dir)[1].get(filename)
+    
+    if search_path is None:
+        return None
+    found_stat = _stat_regular_file(search_path)
+    if found_stat is None:
+        return None
+    with _RESOLVED_FILES_LOCK:
+        _RESOLVED_FILES[key] = search_path
+    return search_path, found_stat
+
+
+async def find_job_file(job_id: str, job_dir: Optional[str], filename: str,
+                        file_index: Optional[dict]) -> Optional[Tuple[str, os.stat_result]]:
+    """
+    Locate a job file without blocking the event loop.
+    
+    Raises:
+        HTTPException: 404 if the job directory does not exist
+    """
+    found = await run_in_threadpool(locate_job_file, job_id, job_dir, filename, file_index) if job_dir else None
+    # A found file implies its directory exists; only misses check the directory
+    if found is None and not (job_dir and await run_in_threadpool(os.path.isdir, job_dir)):
+        raise HTTPException(status_code=404, detail="Job files not found")
+    return found
 
 
 @router.get("/files/{job_id}/{filename}")
 async def download_file(
     job_id: str, 
     filename: str,
-    inline: bool = Query(False, description="Whether to display file inline or as attachment")
+    inline: bool = Query(False, description="Whether to display file inline or as attachment"),
+    range_header: Optional[str] = Header(None, alias="range"),
+    if_none_match: Optional[str] = Header(None, alias="if-none-match"),
+    redis: Redis = Depends(get_async_redis)
 ):
     """
     Download a processed file for a specific job.
     """
     try:
         logger.info("File download request", job_id=job_id, filename=filename, inline=inline)
-        with get_redis_client() as redis_client:
-            job_exists = redis_client.exists(f"job:{job_id}")
-            logger.info("Job exists check", job_id=job_id, exists=job_exists)
-            
-            if not job_exists:
-                raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
-            
-            job_data = redis_client.hgetall(f"job:{job_id}")
-            original_file_path = job_data.get('file_path')
-            logger.info("Got job data", original_file_path=original_file_path)
-            
-            if original_file_path:
-                job_dir = os.path.dirname(original_file_path)
-            else:
-                job_dir = None
-            
-            logger.info("Job directory", job_dir=job_dir, exists=os.path.exists(job_dir) if job_dir else False)
-        
-        if not job_dir or not os.path.exists(job_dir):
-            raise HTTPException(status_code=404, detail="Job files not found")
         
-        # Search in multiple directories
-        search_directories = [
-            ("stems", "stems"),
-            ("beat_analysis", "beat_analysis"),
-            ("transcription", "transcription"),
-            ("results", "results"),
-            ("", "root")  # Root job directory
-        ]
+        # Only the requested name comes from the client; the subdirectories searched are ours
+        if not is_safe_relname(filename):
+            raise HTTPException(status_code=403, detail="Access denied")
         
+        job_dir, file_index = await get_job_dir(redis, job_id)
+        found = await find_job_file(job_id, job_dir, filename, file_index)
         found_path = None
-        found_mime_type = None
-        
-        for subdir, dir_name in search_directories:
-            if subdir:
-                search_path = os.path.join(job_dir, subdir, filename)
-            else:
-                search_path = os.path.join(job_dir, filename)
-            
-            logger.info(f"Checking {dir_name} directory", search_path=search_path, exists=os.path.exists(search_path))
-            
-            if os.path.exists(search_path):
-                found_path = search_path
-                found_mime_type = get_file_mime_type(search_path)
-                logger.info(f"Found file in {dir_name} directory", path=found_path, mime_type=found_mime_type)
-                break
+        if found:
+            found_path, found_stat = found
+            found_mime_type = get_file_mime_type(found_path)
+            if logger.is_enabled_for(logging.DEBUG):
+                logger.debug("Found file", path=found_path, mime_type=found_mime_type)
         
         if found_path:
+            # Output files are written once; size and mtime identify a version
+            file_size = found_stat.st_size
+            cache_headers = file_cache_headers(found_stat)
+            if if_none_match == cache_headers["ETag"]:
+                return Response(status_code=304, headers=cache_headers)
+            
             # Determine content disposition
             disposition = "inline" if inline else "attachment"
+            headers = {
+                **cache_headers,
+                "Content-Disposition": f'{disposition}; filename="{filename}"',
+                "X-Job-ID": job_id,
+                "Accept-Ranges": "bytes"
+            }
+            
+            # Range requests (seeking, resumed downloads) get 206 Partial Content
+            byte_range = parse_range_header(range_header, file_size) if range_header else None
+            if byte_range:
+                start, end = byte_range
+                # Streaming responses do not compute a length, so the range sets it
+                headers["Content-Range"] = f"bytes {start}-{end}/{file_size}"
+                headers["Content-Length"] = str(end - start + 1)
+                return StreamingResponse(
+                    iter_file_range(found_path, start, end - start + 1),
+                    status_code=206,
+                    media_type=found_mime_type,
+                    headers=headers
+                )
+            
+            # Small files (analysis JSON, transcripts) are answered from memory in one body
+            if file_size <= SMALL_FILE_LIMIT:
+                cache_key = (found_path, found_stat.st_mtime_ns, file_size)
+                content = _SMALL_FILES.get(cache_key)
+                if content is None:
+                    content = await run_in_threadpool(read_small_file, found_path)
+                    _SMALL_FILES[cache_key] = content
+                return Response(content=content, media_type=found_mime_type, headers=headers)
             
+            # Full bodies, stems included, go through FileResponse and its sendfile path
             return FileResponse(
                 path=found_path,
                 filename=filename,
                 media_type=found_mime_type,
-                headers={
-                    "Content-Disposition": f'{disposition}; filename="{filename}"',
-                    "X-Job-ID": job_id
-                }
+                stat_result=found_stat,
+                headers=headers
             )
         
         # If not found, return 404
@@ -136,8 +404,32 @@ async def download_file(
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+def collect_job_files(job_id: str, job_dir: str) -> Optional[list]:
+    """Collect download metadata for every file in a job's output directories (None if it is missing)."""
+    if not os.path.isdir(job_dir):
+        return None
+    entries, _ = scan_job_dir(job_dir)
+    
+    files = []
+    for file, path, category, file_size in entries:
+        mime_type = get_file_mime_type(file)
+        download_url = f"/api/files/{job_id}/{file}"
+        files.append({
+            "filename": file,
+            "category": category,
+            "size": file_size,
+            "mime_type": mime_type,
+            "download_url": download_url,
+            # Kept for clients that read it; every file is served through the job-scoped route
+            "raw_url": download_url,
+            "preview_url": f"/api/files/{job_id}/{file}?inline=true" if mime_type.startswith(('audio/', 'text/', 'application/json')) else None
+        })
+    
+    return files
+
+
 @router.get("/files/{job_id}")
-async def list_job_files(job_id: str):
+async def list_job_files(job_id: str, redis: Redis = Depends(get_async_redis)):
     """
     List all available files for a job.
     
@@ -153,62 +445,16 @@ async def list_job_files(job_id: str):
     try:
         logger.info("Listing job files", job_id=job_id)
         
-        with get_redis_client() as redis_client:
-            # Check if job exists
-            job_exists = redis_client.exists(f"job:{job_id}")
-            if not job_exists:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Job {job_id} not found"
-                )
-            
-            # Get job data
-            job_data = redis_client.hgetall(f"job:{job_id}")
-            file_path = job_data.get('file_path')
-            
-            # Extract job directory from file path
-            if file_path:
-                job_dir = os.path.dirname(file_path)
-            else:
-                job_dir = None
+        job_dir, _ = await get_job_dir(redis, job_id)
         
-        if not job_dir or not os.path.exists(job_dir):
+        # Directory checks, walks and stats are blocking; keep them off the event loop
+        files = await run_in_threadpool(collect_job_files, job_id, job_dir) if job_dir else None
+        if files is None:
             raise HTTPException(
                 status_code=404,
                 detail="Job files not found"
             )
         
-        # Collect all files
-        files = []
-        
-        def add_files_from_dir(directory: str, category: str):
-            """Helper function to add files from a directory."""
-            if os.path.exists(directory):
-                for file in os.listdir(directory):
-                    file_path = os.path.join(directory, file)
-                    if os.path.isfile(file_path):
-                        try:
-                            file_size = os.path.getsize(file_path)
-                            mime_type = get_file_mime_type(file_path)
-                            
-                            files.append({
-                                "filename": file,
-                                "category": category,
-                                "size": file_size,
-                                "mime_type": mime_type,
-                                "download_url": f"/api/files/{job_id}/{file}",
-                                "preview_url": f"/api/files/{job_id}/{file}?inline=true" if mime_type.startswith(('audio/', 'text/', 'application/json')) else None
-                            })
-                        except:
-                            pass  # Skip files that can't be accessed
-        
-        # Add files from different categories
-        add_files_from_dir(os.path.join(job_dir, "stems"), "stem_separation")
-        add_files_from_dir(os.path.join(job_dir, "transcription"), "transcription")
-        add_files_from_dir(os.path.join(job_dir, "beat_analysis"), "beat_analysis")
-        add_files_from_dir(os.path.join(job_dir, "results"), "results")
-        add_files_from_dir(job_dir, "general")  # Files directly in job directory
-        
         # Sort files by category and filename
         files.sort(key=lambda x: (x['category'], x['filename']))
         
@@ -234,7 +480,7 @@ async def list_job_files(job_id: str):
 
 
 @router.head("/files/{job_id}/{filename}")
-async def check_file_exists(job_id: str, filename: str):
+async def check_file_exists(job_id: str, filename: str, redis: Redis = Depends(get_async_redis)):
     """
     Check if a file exists without downloading it (HEAD request).
     
@@ -246,51 +492,28 @@ async def check_file_exists(job_id: str, filename: str):
         Response with headers indicating file existence and metadata
     """
     try:
-        with get_redis_client() as redis_client:
-            # Check if job exists
-            job_exists = redis_client.exists(f"job:{job_id}")
-            if not job_exists:
-                raise HTTPException(status_code=404, detail="Job not found")
-            
-            # Get job data
-            job_data = redis_client.hgetall(f"job:{job_id}")
-            job_dir = job_data.get('job_dir')
-        
-        if not job_dir or not os.path.exists(job_dir):
-            raise HTTPException(status_code=404, detail="Job files not found")
-        
-        # Check file existence (same logic as download_file)
-        file_path = os.path.join(job_dir, filename)
-        
-        if not is_safe_path(job_dir, filename):
+        if not is_safe_relname(filename):
             raise HTTPException(status_code=403, detail="Access denied")
         
-        if not os.path.exists(file_path):
-            # Try subdirectories
-            possible_paths = [
-                os.path.join(job_dir, "stems", filename),
-                os.path.join(job_dir, "transcription", filename),
-                os.path.join(job_dir, "beat_analysis", filename),
-                os.path.join(job_dir, "results", filename)
-            ]
-            
-            for possible_path in possible_paths:
-                if os.path.exists(possible_path) and is_safe_path(job_dir, os.path.relpath(possible_path, job_dir)):
-                    file_path = possible_path
-                    break
-            else:
-                raise HTTPException(status_code=404, detail="File not found")
+        job_dir, file_index = await get_job_dir(redis, job_id)
+        
+        # Check file existence (same lookup as download_file)
+        found = await find_job_file(job_id, job_dir, filename, file_index)
+        if not found:
+            raise HTTPException(status_code=404, detail="File not found")
         
         # Get file metadata
-        file_size = os.path.getsize(file_path)
+        file_path, file_stat = found
+        file_size = file_stat.st_size
         mime_type = get_file_mime_type(file_path)
         
         # Return response with headers but no body
         return Response(
-            content="",
             headers={
+                **file_cache_headers(file_stat),
                 "Content-Type": mime_type,
                 "Content-Length": str(file_size),
+                "Accept-Ranges": "bytes",
                 "X-Job-ID": job_id,
                 "X-File-Exists": "true"
             }
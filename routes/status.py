@@ -3,14 +3,17 @@ Status endpoint for the Karaoke Backend API.
 Handles job status checking and progress monitoring.
 """
 
-import os
-from typing import Dict, Any, Optional
-from fastapi import APIRouter, HTTPException, Response
+import json
+from typing import Dict, Any, Optional, Sequence
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from datetime import datetime
+from redis.asyncio import Redis
+from redis.exceptions import WatchError
 
-from database.redis_client import get_redis_client
-from models.job import JobStatus, ProcessingStep
+from routes.dependencies import get_async_redis
+from models.job import STATUS_JSON_FIELD, JobStatus, ProcessingStep
 from utils.logger import get_logger
 
 logger = get_logger("status")
@@ -41,8 +44,175 @@ class JobStatusResponse(BaseModel):
     file_size: Optional[int] = None
 
 
+def _text(value: str) -> Optional[str]:
+    """Parse a string field; empty and "None" mean unset."""
+    return None if value in ("", "None") else value
+
+
+def _int(value: str) -> Optional[int]:
+    """Parse an integer field (floats are truncated); unparseable values are unset."""
+    try:
+        return int(float(value))
+    except ValueError:
+        return None
+
+
+def _float(value: str) -> Optional[float]:
+    """Parse a float field; unparseable values are unset."""
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def _scalar(value: str) -> Any:
+    """Parse a field that may hold a number or free text."""
+    value = _text(value)
+    if value is None:
+        return None
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+
+# Job hash fields read by the status route and the parser for each
+STATUS_FIELDS = (
+    ("status", _text),
+    ("progress", _int),
+    ("current_step", _text),
+    ("created_at", _float),
+    ("updated_at", _float),
+    ("error_message", _text),
+    ("stem_separation_status", _text),
+    ("stem_separation_progress", _int),
+    ("vocals_path", _text),
+    ("drums_path", _text),
+    ("bass_path", _text),
+    ("other_path", _text),
+    ("stem_separation_time", _float),
+    ("stem_separation_error", _text),
+    ("transcription_status", _text),
+    ("transcription_progress", _int),
+    ("transcription_path", _text),
+    ("transcription_language", _text),
+    ("transcription_word_count", _int),
+    ("transcription_time", _float),
+    ("transcription_error", _text),
+    ("beat_analysis_status", _text),
+    ("beat_analysis_progress", _int),
+    ("time_signature", _scalar),
+    ("beat_confidence", _float),
+    ("rhythm_regularity", _float),
+    ("beat_analysis_time", _float),
+    ("beat_analysis_error", _text),
+    ("audio_duration", _float),
+    ("tempo_bpm", _float),
+    ("beat_count", _int),
+    ("file_size", _int),
+)
+STATUS_FIELD_NAMES = tuple(name for name, _ in STATUS_FIELDS)
+
+
+def build_status_response(job_id: str, values: Sequence[Optional[str]]) -> JobStatusResponse:
+    """Build the status response from the raw HMGET values of STATUS_FIELD_NAMES."""
+    # Fields missing from the hash are left out, so stage sections can test for their status key
+    job = {
+        name: parse(raw)
+        for (name, parse), raw in zip(STATUS_FIELDS, values)
+        if raw is not None
+    }
+    
+    # Parse basic job information
+    status = job.get('status') or 'unknown'
+    progress = job.get('progress') or 0
+    current_step = job.get('current_step') or 'unknown'
+    error_message = job.get('error_message')
+    
+    # Calculate processing time if available
+    created_at = job.get('created_at')
+    updated_at = job.get('updated_at')
+    processing_time = None
+    if created_at and updated_at:
+        processing_time = updated_at - created_at
+        
+        # Convert timestamps to ISO format strings for response
+        created_at = datetime.fromtimestamp(created_at).isoformat()
+        updated_at = datetime.fromtimestamp(updated_at).isoformat()
+    
+    # Estimate completion time for active jobs
+    estimated_completion = None
+    if status in ('processing', 'queued') and progress > 0 and processing_time:
+        estimated_seconds = (100 - progress) * processing_time / progress
+        estimated_completion = f"{estimated_seconds:.1f} seconds"
+    
+    # Get stage-specific information
+    stem_separation_info = None
+    if 'stem_separation_status' in job:
+        stem_separation_info = {
+            'status': job['stem_separation_status'],
+            'progress': job.get('stem_separation_progress'),
+            'vocals_path': job.get('vocals_path'),
+            'drums_path': job.get('drums_path'),
+            'bass_path': job.get('bass_path'),
+            'other_path': job.get('other_path'),
+            'processing_time': job.get('stem_separation_time'),
+            'error': job.get('stem_separation_error')
+        }
+    
+    transcription_info = None
+    if 'transcription_status' in job:
+        transcription_info = {
+            'status': job['transcription_status'],
+            'progress': job.get('transcription_progress'),
+            'transcription_path': job.get('transcription_path'),
+            'language': job.get('transcription_language'),
+            'word_count': job.get('transcription_word_count'),
+            'processing_time': job.get('transcription_time'),
+            'error': job.get('transcription_error')
+        }
+    
+    # Zero readings are reported as unset
+    tempo_bpm = job.get('tempo_bpm') or None
+    beat_count = job.get('beat_count') or None
+    
+    beat_analysis_info = None
+    if 'beat_analysis_status' in job:
+        beat_analysis_info = {
+            'status': job['beat_analysis_status'],
+            'progress': job.get('beat_analysis_progress'),
+            'tempo_bpm': tempo_bpm,
+            'beat_count': beat_count,
+            'time_signature': job.get('time_signature'),
+            'beat_confidence': job.get('beat_confidence') or None,
+            'rhythm_regularity': job.get('rhythm_regularity') or None,
+            'processing_time': job.get('beat_analysis_time'),
+            'error': job.get('beat_analysis_error')
+        }
+    
+    # Every value above is already parsed to its field type, so skip validation
+    return JobStatusResponse.model_construct(
+        job_id=job_id,
+        status=status,
+        progress=progress,
+        current_step=current_step,
+        created_at=created_at,
+        updated_at=updated_at,
+        estimated_completion=estimated_completion,
+        processing_time=processing_time,
+        error_message=error_message,
+        stem_separation=stem_separation_info,
+        transcription=transcription_info,
+        beat_analysis=beat_analysis_info,
+        audio_duration=job.get('audio_duration') or None,
+        tempo_bpm=tempo_bpm,
+        beat_count=beat_count,
+        file_size=job.get('file_size') or None
+    )
+
+
 @router.get("/status/{job_id}", response_model=JobStatusResponse)
-async def get_job_status(job_id: str):
+async def get_job_status(job_id: str, redis: Redis = Depends(get_async_redis)):
     """
     Get comprehensive job status and progress information.
     
@@ -57,145 +227,45 @@ async def get_job_status(job_id: str):
     """
     try:
         logger.info("Getting job status", job_id=job_id)
+        job_key = f"job:{job_id}"
         
-        with get_redis_client() as redis_client:
-            # Check if job exists
-            job_exists = redis_client.exists(f"job:{job_id}")
-            if not job_exists:
+        # Serve the pre-rendered status while no write has touched the job since it was built
+        body = await redis.hget(job_key, STATUS_JSON_FIELD)
+        if body is not None:
+            return Response(content=body, media_type="application/json")
+        
+        # Build it from the hash under WATCH, so a status rendered from data a
+        # worker changed in the meantime is never stored
+        async with redis.pipeline(transaction=True) as pipe:
+            await pipe.watch(job_key)
+            values = await pipe.hmget(job_key, STATUS_FIELD_NAMES)
+            
+            # A missing job reads back as all nils
+            if all(value is None for value in values):
                 logger.warning("Job not found", job_id=job_id)
                 raise HTTPException(
                     status_code=404,
                     detail=f"Job {job_id} not found"
                 )
             
-            # Get all job data
-            job_data = redis_client.hgetall(f"job:{job_id}")
-            
-            if not job_data:
-                logger.error("Job data is empty", job_id=job_id)
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Job {job_id} data not found"
-                )
-        
-        # Parse basic job information
-        status = job_data.get('status', 'unknown')
-        if status == 'None' or status is None:
-            status = 'unknown'
+            response = build_status_response(job_id, values)
+            body = response.model_dump_json()
             
-        progress = int(job_data.get('progress', 0))
-        
-        current_step = job_data.get('current_step', 'unknown')
-        if current_step == 'None' or current_step is None:
-            current_step = 'unknown'
-            
-        created_at = job_data.get('created_at')
-        updated_at = job_data.get('updated_at')
-        
-        error_message = job_data.get('error_message')
-        if error_message == 'None':
-            error_message = None
-        
-        # Calculate processing time if available
-        processing_time = None
-        if created_at and updated_at and created_at != 'None' and updated_at != 'None':
-            try:
-                # Timestamps are stored as Unix timestamps (floats)
-                created_timestamp = float(created_at)
-                updated_timestamp = float(updated_at)
-                processing_time = updated_timestamp - created_timestamp
-                
-                # Convert timestamps to ISO format strings for response
-                created_at = datetime.fromtimestamp(created_timestamp).isoformat()
-                updated_at = datetime.fromtimestamp(updated_timestamp).isoformat()
-            except (ValueError, TypeError):
-                # If conversion fails, keep original values
-                processing_time = None
-        
-        # Estimate completion time for active jobs
-        estimated_completion = None
-        if status in ['processing', 'queued'] and progress > 0 and processing_time:
             try:
-                remaining_progress = 100 - progress
-                time_per_percent = processing_time / progress
-                estimated_seconds = remaining_progress * time_per_percent
-                estimated_completion = f"{estimated_seconds:.1f} seconds"
-            except:
+                pipe.multi()
+                pipe.hset(job_key, STATUS_JSON_FIELD, body)
+                await pipe.execute()
+            except WatchError:
+                # The job changed while rendering; the next poll stores a fresh one
                 pass
         
-        # Get stage-specific information
-        stem_separation_info = None
-        if 'stem_separation_status' in job_data:
-            stem_separation_info = {
-                'status': job_data.get('stem_separation_status'),
-                'progress': job_data.get('stem_separation_progress'),
-                'vocals_path': job_data.get('vocals_path'),
-                'drums_path': job_data.get('drums_path'),
-                'bass_path': job_data.get('bass_path'),
-                'other_path': job_data.get('other_path'),
-                'processing_time': job_data.get('stem_separation_time'),
-                'error': job_data.get('stem_separation_error')
-            }
-        
-        transcription_info = None
-        if 'transcription_status' in job_data:
-            transcription_info = {
-                'status': job_data.get('transcription_status'),
-                'progress': job_data.get('transcription_progress'),
-                'transcription_path': job_data.get('transcription_path'),
-                'language': job_data.get('transcription_language'),
-                'word_count': job_data.get('transcription_word_count'),
-                'processing_time': job_data.get('transcription_time'),
-                'error': job_data.get('transcription_error')
-            }
-        
-        beat_analysis_info = None
-        if 'beat_analysis_status' in job_data:
-            beat_analysis_info = {
-                'status': job_data.get('beat_analysis_status'),
-                'progress': job_data.get('beat_analysis_progress'),
-                'tempo_bpm': float(job_data.get('tempo_bpm', 0)) if job_data.get('tempo_bpm') else None,
-                'beat_count': int(job_data.get('beat_count', 0)) if job_data.get('beat_count') else None,
-                'time_signature': job_data.get('time_signature'),
-                'beat_confidence': float(job_data.get('beat_confidence', 0)) if job_data.get('beat_confidence') else None,
-                'rhythm_regularity': float(job_data.get('rhythm_regularity', 0)) if job_data.get('rhythm_regularity') else None,
-                'processing_time': job_data.get('beat_analysis_time'),
-                'error': job_data.get('beat_analysis_error')
-            }
-        
-        # Get summary information
-        audio_duration = float(job_data.get('audio_duration', 0)) if job_data.get('audio_duration') else None
-        tempo_bpm = float(job_data.get('tempo_bpm', 0)) if job_data.get('tempo_bpm') else None
-        beat_count = int(job_data.get('beat_count', 0)) if job_data.get('beat_count') else None
-        file_size = int(job_data.get('file_size', 0)) if job_data.get('file_size') else None
-        
-        # Build response
-        response = JobStatusResponse(
-            job_id=job_id,
-            status=status,
-            progress=progress,
-            current_step=current_step,
-            created_at=created_at,
-            updated_at=updated_at,
-            estimated_completion=estimated_completion,
-            processing_time=processing_time,
-            error_message=error_message,
-            stem_separation=stem_separation_info,
-            transcription=transcription_info,
-            beat_analysis=beat_analysis_info,
-            audio_duration=audio_duration,
-            tempo_bpm=tempo_bpm,
-            beat_count=beat_count,
-            file_size=file_size
-        )
-        
         logger.info("Job status retrieved successfully", 
                    job_id=job_id, 
-                   status=status, 
-                   progress=progress,
-                   current_step=current_step)
+                   status=response.status, 
+                   progress=response.progress,
+                   current_step=response.current_step)
         
-        return response
+        return Response(content=body, media_type="application/json")
         
     except HTTPException:
         # Re-raise HTTP exceptions
@@ -212,7 +282,7 @@ async def get_job_status(job_id: str):
 
 
 @router.get("/status/{job_id}/simple")
-async def get_simple_job_status(job_id: str):
+async def get_simple_job_status(job_id: str, redis: Redis = Depends(get_async_redis)):
     """
     Get simplified job status for quick polling.
     
@@ -225,28 +295,27 @@ async def get_simple_job_status(job_id: str):
     try:
         logger.info("Getting simple job status", job_id=job_id)
         
-        with get_redis_client() as redis_client:
-            # Check if job exists
-            job_exists = redis_client.exists(f"job:{job_id}")
-            if not job_exists:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Job {job_id} not found"
-                )
-            
-            # Get basic status information
-            status = redis_client.hget(f"job:{job_id}", 'status') or 'unknown'
-            progress = int(redis_client.hget(f"job:{job_id}", 'progress') or 0)
-            current_step = redis_client.hget(f"job:{job_id}", 'current_step') or 'unknown'
-            error_message = redis_client.hget(f"job:{job_id}", 'error_message')
+        # Get basic status information in one round trip; all nils means the job does not exist
+        values = await redis.hmget(f"job:{job_id}", ('status', 'progress', 'current_step', 'error_message'))
+        if all(value is None for value in values):
+            raise HTTPException(
+                status_code=404,
+                detail=f"Job {job_id} not found"
+            )
+        
+        status, progress, current_step, error_message = values
+        status = status or 'unknown'
+        progress = int(progress or 0)
+        current_step = current_step or 'unknown'
         
-        return {
+        # Plain str/int values: return the response directly and skip jsonable_encoder
+        return ORJSONResponse({
             "job_id": job_id,
             "status": status,
             "progress": progress,
             "current_step": current_step,
             "error_message": error_message
-        }
+        })
         
     except HTTPException:
         raise
@@ -6,10 +6,12 @@ Handles audio file uploads and initiates processing jobs.
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
+import os
 import time
 
 from models.job import job_manager, JobStatus, ProcessingStep
-from utils.file_handler import file_manager
+from routes.static import invalidate_job_file_cache
+from utils.file_handler import FileValidator, file_manager
 from utils.logger import get_logger
 
 logger = get_logger("upload")
@@ -26,14 +28,20 @@ class ProcessResponse(BaseModel):
     estimated_time: str
 
 
-class ProcessingConfig(BaseModel):
-    """Processing configuration options."""
-    whisper_model: Optional[str] = None
-    demucs_model: Optional[str] = None
-    audio_sample_rate: Optional[int] = None
-    enable_beat_tracking: bool = True
-    enable_vocals_extraction: bool = True
-    language: Optional[str] = None  # For Whisper transcription
+# Allowance for multipart framing and form fields on top of the file itself
+UPLOAD_BODY_SLACK = 1 << 20
+
+
+def upload_too_large(content_length: Optional[str]) -> bool:
+    """
+    Check a /process request's declared Content-Length against the upload size limit.
+    
+    FastAPI reads the multipart body before running route dependencies, so app.py calls
+    this from middleware to reject oversized uploads before any bytes are received.
+    """
+    if not content_length or not content_length.isdigit():
+        return False
+    return int(content_length) > FileValidator.get_max_file_size() + UPLOAD_BODY_SLACK
 
 
 async def validate_upload_requirements(file: UploadFile = File(...)):
@@ -81,7 +89,7 @@ async def process_audio(
     Returns:
         ProcessResponse with job_id and processing information
     """
-    start_time = time.time()
+    start_time = time.monotonic()
     
     logger.info(
         "Processing request received",
@@ -91,15 +99,19 @@ async def process_audio(
     )
     
     try:
-        # Create processing configuration
-        processing_config = ProcessingConfig(
-            whisper_model=whisper_model,
-            demucs_model=demucs_model,
-            audio_sample_rate=audio_sample_rate,
-            enable_beat_tracking=enable_beat_tracking,
-            enable_vocals_extraction=enable_vocals_extraction,
-            language=language
-        ).model_dump(exclude_none=True)
+        # Create processing configuration; the form fields are already validated,
+        # so unset options are simply left out
+        processing_config = {
+            key: value for key, value in (
+                ('whisper_model', whisper_model),
+                ('demucs_model', demucs_model),
+                ('audio_sample_rate', audio_sample_rate),
+                ('enable_beat_tracking', enable_beat_tracking),
+                ('enable_vocals_extraction', enable_vocals_extraction),
+                ('language', language),  # For Whisper transcription
+            )
+            if value is not None
+        }
         
         # Create job first to get job_id
         job_data = job_manager.create_job(
@@ -113,23 +125,20 @@ async def process_audio(
         logger.info("Job created", job_id=job_id, filename=file.filename)
         
         try:
-            # Update job status to indicate file upload is starting
-            job_manager.update_job_status(
+            # Update job status to indicate file upload is starting; the job was
+            # just created, so its state is known and need not be read back
+            job_manager.patch_job(
                 job_id,
-                JobStatus.PROCESSING,
+                previous_status=job_data.status,
+                status=JobStatus.PROCESSING,
                 progress=5,
-                current_step=ProcessingStep.UPLOAD
+                current_step=ProcessingStep.UPLOAD,
+                started_at=time.time()
             )
             
             # Process file upload
             file_info = await file_manager.process_upload(file, job_id)
             
-            # Update job with actual file information
-            job_data = job_manager.get_job(job_id)
-            job_data.file_path = file_info['file_path']
-            job_data.file_size = file_info['file_size']
-            job_manager.save_job(job_data)
-            
             # Store metadata in Redis if available
             if file_info.get('metadata'):
                 metadata = file_info['metadata']
@@ -149,12 +158,19 @@ async def process_audio(
                 except Exception as e:
                     logger.error("Failed to store metadata in Redis", job_id=job_id, error=str(e))
             
-            # Update job status to indicate file upload is complete
-            job_manager.update_job_status(
+            # Mark the upload complete and record the file information in one write.
+            # The job directory is resolved once here so file routes never canonicalize.
+            status = JobStatus.QUEUED
+            job_manager.patch_job(
                 job_id,
-                JobStatus.QUEUED,
+                previous_status=JobStatus.PROCESSING,
+                status=status,
                 progress=10,
-                current_step=ProcessingStep.VALIDATION
+                current_step=ProcessingStep.VALIDATION,
+                file_path=file_info['file_path'],
+                file_size=file_info['file_size'],
+                file_hash=file_info['file_hash'],
+                job_dir=os.path.realpath(os.path.dirname(file_info['file_path']))
             )
             
             # Start background processing task
@@ -166,9 +182,7 @@ async def process_audio(
                 )
                 
                 # Store task ID in job data for tracking
-                job_data = job_manager.get_job(job_id)
-                job_data.task_id = task.id
-                job_manager.save_job(job_data)
+                job_manager.patch_job(job_id, task_id=task.id)
                 
                 logger.info(
                     "Background processing task started",
@@ -179,6 +193,7 @@ async def process_audio(
             except Exception as e:
                 logger.error("Failed to start background task", job_id=job_id, error=str(e))
                 # Don't fail the upload, but mark as failed processing
+                status = JobStatus.FAILED
                 job_manager.update_job_status(
                     job_id,
                     JobStatus.FAILED,
@@ -189,7 +204,7 @@ async def process_audio(
             estimated_minutes = max(1, file_info['file_size'] // (1024 * 1024))  # ~1 min per MB
             estimated_time = f"{estimated_minutes}-{estimated_minutes * 2} minutes"
             
-            processing_time = time.time() - start_time
+            processing_time = time.monotonic() - start_time
             
             logger.info(
                 "File upload completed successfully",
@@ -202,7 +217,7 @@ async def process_audio(
             
             return ProcessResponse(
                 job_id=job_id,
-                status=job_data.status.value,
+                status=status.value,
                 message="File uploaded successfully. Processing will begin shortly.",
                 filename=file.filename,
                 file_size=file_info['file_size'],
@@ -283,6 +298,8 @@ async def cleanup_job_files(job_id: str):
         success = file_manager.cleanup_job(job_id)
         
         if success:
+            invalidate_job_file_cache(job_id)
+            job_manager.clear_output_files(job_id)
             logger.info("Manual cleanup completed", job_id=job_id)
             return {"message": "Files cleaned up successfully", "job_id": job_id}
         else:
@@ -4,14 +4,49 @@ Orchestrates stem separation, transcription, and beat analysis.
 """
 
 from celery import group, chain, chord
-from celery.exceptions import Retry
+from celery.exceptions import OperationalError, Retry
+from celery.signals import worker_ready
 import os
 import time
+import orjson
+import soundfile as sf
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+
+from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
 
 from celery_app import celery_app, get_task_logger, update_job_progress
-from models.job import job_manager, JobStatus, ProcessingStep
+from config import settings
+from models.job import job_manager, JobStatus, ProcessingStep, STAGES_PROGRESS_START
+
+
+# Stage tasks, dispatched by name so this module (imported by the API) does not load the models
+STAGE_TASKS = {
+    'stem_separation': 'tasks.stem_separation.separate_stems_task',
+    'beat_analysis': 'tasks.beat_analysis.analyze_beats_task',
+}
+
+
+class PermanentPipelineError(Exception):
+    """A pipeline failure that retrying cannot fix (missing job or file, invalid audio)."""
+
+
+# Failures worth retrying: broker, Redis and network hiccups
+TRANSIENT_ERRORS = (
+    TimeoutError,
+    ConnectionError,
+    OperationalError,
+    RedisConnectionError,
+    RedisTimeoutError,
+)
+
+
+@worker_ready.connect
+def check_stage_tasks(sender=None, **kwargs):
+    """Report at worker boot any stage task the pipeline dispatches by name that is not registered."""
+    missing = sorted(name for name in STAGE_TASKS.values() if name not in celery_app.tasks)
+    if missing:
+        get_task_logger("audio_processing").error("Pipeline stage tasks not registered", tasks=missing)
 
 
 @celery_app.task(bind=True, name='tasks.audio_processing.process_audio_file')
@@ -26,12 +61,20 @@ def process_audio_file(self, job_id: str, processing_config: Dict[str, Any] = No
     4. Analyze beat and tempo
     5. Generate final results
     
+    Validation runs here; the enabled stages are then dispatched as a chord whose
+    header runs on the stage queues in parallel and whose callback,
+    finalize_pipeline, records the stage results and completes the job. This task
+    returns as soon as the chord is dispatched instead of holding a worker slot
+    for the whole pipeline. With PARALLEL_STAGES disabled (single-worker
+    deployments) the stages and the callback run here, one after the other.
+    
     Args:
         job_id: Unique job identifier
         processing_config: Configuration options for processing
         
     Returns:
-        Dict containing processing results and file paths
+        Dict with the job id and the stages dispatched, or the pipeline results
+        when the stages run in this task
     """
     task_logger = get_task_logger("audio_processing")
     task_logger.info("Starting audio processing pipeline", job_id=job_id, task_id=self.request.id)
@@ -48,10 +91,10 @@ def process_audio_file(self, job_id: str, processing_config: Dict[str, Any] = No
         # Get job data
         job_data = job_manager.get_job(job_id)
         if not job_data:
-            raise Exception(f"Job {job_id} not found")
+            raise PermanentPipelineError(f"Job {job_id} not found")
         
         if not os.path.exists(job_data.file_path):
-            raise Exception(f"Audio file not found: {job_data.file_path}")
+            raise PermanentPipelineError(f"Audio file not found: {job_data.file_path}")
         
         task_logger.info(
             "Job data loaded",
@@ -81,23 +124,110 @@ def process_audio_file(self, job_id: str, processing_config: Dict[str, Any] = No
         results['stages']['validation'] = validation_result
         
         if not validation_result['valid']:
-            raise Exception(f"Audio validation failed: {validation_result['error']}")
+            raise PermanentPipelineError(f"Audio validation failed: {validation_result['error']}")
+        
+        # Stages 2 and 4 only need the original file, so they run side by side
+        stage_names = []
+        header = []
         
         # Stage 2: Stem Separation (if enabled)
         if config.get('enable_vocals_extraction', True):
             task_logger.info("Stage 2: Stem separation", job_id=job_id)
-            update_job_progress(job_id, 30, current_step=ProcessingStep.STEM_SEPARATION)
-            
-            # Update task status
             job_manager.update_task_status(job_id, "stem_separation", "processing", 0)
+            stage_names.append('stem_separation')
+            header.append(celery_app.signature(
+                STAGE_TASKS['stem_separation'],
+                args=(job_id, job_data.file_path, config), immutable=True
+            ))
+        else:
+            task_logger.info("Stem separation skipped (disabled)", job_id=job_id)
+            job_manager.update_task_status(job_id, "stem_separation", "skipped", 100)
+            results['stages']['stem_separation'] = {'success': 1, 'skipped': 1}  # Convert booleans to ints
+        
+        # Stage 3: Vocal Transcription (temporarily disabled)
+        task_logger.info("Transcription skipped (temporarily disabled)", job_id=job_id)
+        job_manager.update_task_status(job_id, "transcription", "skipped", 100)
+        results['stages']['transcription'] = {'success': 1, 'skipped': 1}  # Convert booleans to ints
+        
+        # Stage 4: Beat Analysis (if enabled)
+        if config.get('enable_beat_tracking', True):
+            task_logger.info("Stage 4: Beat analysis", job_id=job_id)
+            job_manager.update_task_status(job_id, "beat_analysis", "processing", 0)
+            job_dir = str(Path(job_data.file_path).parent)
+            stage_names.append('beat_analysis')
+            header.append(celery_app.signature(
+                STAGE_TASKS['beat_analysis'],
+                args=(job_id, job_data.file_path, job_dir, config), immutable=True
+            ))
+        else:
+            task_logger.info("Beat analysis skipped (disabled)", job_id=job_id)
+            job_manager.update_task_status(job_id, "beat_analysis", "skipped", 100)
+            results['stages']['beat_analysis'] = {'success': 1, 'skipped': 1}  # Convert booleans to ints
+        
+        update_job_progress(job_id, STAGES_PROGRESS_START, current_step=ProcessingStep.STEM_SEPARATION
+                            if 'stem_separation' in stage_names else ProcessingStep.BEAT_ANALYSIS)
+        
+        callback = finalize_pipeline.s(job_id, results, stage_names)
+        if not settings.parallel_stages:
+            # As on the chord path, a failure is recorded on the job once and not retried
+            stage_results = []
+            for name, stage in zip(stage_names, header):
+                outcome = stage.apply()
+                if outcome.failed():
+                    task_logger.error("Processing stage crashed", job_id=job_id, stage=name, error=str(outcome.result))
+                    fail_job(job_id, f"Audio processing failed: {outcome.result}", results)
+                    return {'job_id': job_id, 'stages': stage_names}
+                stage_results.append(outcome.result)
             
-            # Import and call stem separation task directly
-            from tasks.stem_separation import separate_stems_task
-            # Call the task function directly (not through Celery)
-            stem_result = separate_stems_task.run(job_id, job_data.file_path, config)
-            
-            results['stages']['stem_separation'] = stem_result
-            
+            # Run without the chord's error callback, so a failure is recorded here only
+            outcome = callback.apply(args=(stage_results,))
+            if outcome.failed():
+                fail_job(job_id, f"Audio processing failed: {outcome.result}", results)
+                return {'job_id': job_id, 'stages': stage_names}
+            return outcome.result
+        
+        if header:
+            chord(header)(callback.on_error(pipeline_failed.s(job_id)))
+        else:
+            callback.delay([])
+        
+        task_logger.info("Processing stages dispatched", job_id=job_id, stages=stage_names)
+        return {'job_id': job_id, 'stages': stage_names}
+        
+    except Exception as e:
+        error_msg = f"Audio processing failed: {str(e)}"
+        task_logger.error("Audio processing pipeline failed", job_id=job_id, error=str(e))
+        fail_job(job_id, error_msg, locals().get('results'))
+        
+        # Only transient failures are retried; anything else would fail the same way again
+        if isinstance(e, TRANSIENT_ERRORS):
+            raise self.retry(exc=e, countdown=60, max_retries=2)
+        raise
+
+
+@celery_app.task(bind=True, name='tasks.audio_processing.finalize_pipeline')
+def finalize_pipeline(self, stage_results: List[Dict[str, Any]], job_id: str,
+                      results: Dict[str, Any], stage_names: List[str]) -> Dict[str, Any]:
+    """
+    Chord callback: record the stage results and complete the job.
+    
+    Args:
+        stage_results: Results of the dispatched stage tasks, in dispatch order
+        job_id: Unique job identifier
+        results: Results structure started by process_audio_file
+        stage_names: Names of the dispatched stages, matching stage_results
+        
+    Returns:
+        Dict containing processing results and file paths
+    """
+    task_logger = get_task_logger("audio_processing")
+    
+    try:
+        stages = dict(zip(stage_names, stage_results))
+        results['stages'].update(stages)
+        
+        stem_result = stages.get('stem_separation')
+        if stem_result is not None:
             if stem_result['success']:
                 # Update task status with results
                 job_manager.update_task_status(
@@ -113,35 +243,10 @@ def process_audio_file(self, job_id: str, processing_config: Dict[str, Any] = No
                     job_id, "stem_separation", "failed", 0, 
                     error=stem_result.get('error')
                 )
-                raise Exception(f"Stem separation failed: {stem_result['error']}")
-        else:
-            task_logger.info("Stem separation skipped (disabled)", job_id=job_id)
-            job_manager.update_task_status(job_id, "stem_separation", "skipped", 100)
-            results['stages']['stem_separation'] = {'success': 1, 'skipped': 1}  # Convert booleans to ints
-        
-        # Stage 3: Vocal Transcription (temporarily disabled)
-        task_logger.info("Transcription skipped (temporarily disabled)", job_id=job_id)
-        job_manager.update_task_status(job_id, "transcription", "skipped", 100)
-        results['stages']['transcription'] = {'success': 1, 'skipped': 1}  # Convert booleans to ints
+                raise PermanentPipelineError(f"Stem separation failed: {stem_result['error']}")
         
-        # Stage 4: Beat Analysis (if enabled)
-        if config.get('enable_beat_tracking', True):
-            task_logger.info("Stage 4: Beat analysis", job_id=job_id)
-            update_job_progress(job_id, 85, current_step=ProcessingStep.BEAT_ANALYSIS)
-            
-            # Update task status
-            job_manager.update_task_status(job_id, "beat_analysis", "processing", 0)
-            
-            # Import and call beat analysis task directly
-            from tasks.beat_analysis import analyze_beats_task
-            # Calculate job directory from file path
-            from pathlib import Path
-            job_dir = str(Path(job_data.file_path).parent)
-            # Call the task function directly (not through Celery)
-            beat_result = analyze_beats_task.run(job_id, job_data.file_path, job_dir, config)
-            
-            results['stages']['beat_analysis'] = beat_result
-            
+        beat_result = stages.get('beat_analysis')
+        if beat_result is not None:
             if beat_result['success']:
                 # Update task status with results
                 job_manager.update_task_status(
@@ -159,10 +264,6 @@ def process_audio_file(self, job_id: str, processing_config: Dict[str, Any] = No
                     error=beat_result.get('error')
                 )
                 task_logger.warning("Beat analysis failed but continuing", job_id=job_id, error=beat_result.get('error'))
-        else:
-            task_logger.info("Beat analysis skipped (disabled)", job_id=job_id)
-            job_manager.update_task_status(job_id, "beat_analysis", "skipped", 100)
-            results['stages']['beat_analysis'] = {'success': 1, 'skipped': 1}  # Convert booleans to ints
         
         # Stage 5: Finalization
         task_logger.info("Stage 5: Finalizing results", job_id=job_id)
@@ -173,22 +274,20 @@ def process_audio_file(self, job_id: str, processing_config: Dict[str, Any] = No
         results['stages']['finalization'] = finalization_result
         
         # Complete processing
+        # started_at was stamped by the dispatching task, possibly on another host, so
+        # only wall-clock time is comparable; clamp so a clock step never goes negative
         results['completed_at'] = time.time()
-        results['total_duration'] = results['completed_at'] - results['started_at']
+        results['total_duration'] = max(0.0, results['completed_at'] - results['started_at'])
         results['success'] = 1  # Convert boolean to int for JSON serialization
         
         # Store results in job data fields
-        if 'stem_separation' in results['stages'] and results['stages']['stem_separation'].get('vocals_path'):
-            job_data.stems = results['stages']['stem_separation']
-        
-        if 'transcription' in results['stages'] and results['stages']['transcription'].get('transcript_text'):
-            job_data.lyrics = results['stages']['transcription']
-        
-        if 'beat_analysis' in results['stages'] and results['stages']['beat_analysis'].get('tempo_bpm'):
-            job_data.beats = results['stages']['beat_analysis']
-        
+        job_data = job_manager.get_job(job_id)
+        store_stage_results(job_data, results)
         job_manager.save_job(job_data)
         
+        # Resolve output files once so the results endpoint does not probe the filesystem
+        job_manager.record_output_files(job_id)
+        
         # Update final status
         update_job_progress(
             job_id=job_id,
@@ -206,47 +305,76 @@ def process_audio_file(self, job_id: str, processing_config: Dict[str, Any] = No
         return results
         
     except Exception as e:
-        error_msg = f"Audio processing failed: {str(e)}"
+        # The job is failed in one place: pipeline_failed, this task's error callback
         task_logger.error("Audio processing pipeline failed", job_id=job_id, error=str(e))
-        
-        # Update job status to failed
-        update_job_progress(
-            job_id=job_id,
-            progress=0,
-            status=JobStatus.FAILED,
-            error_message=error_msg
-        )
-        
-        # Store partial results if available
-        if 'results' in locals():
-            results['success'] = 0  # Convert boolean to int for JSON serialization
-            results['error'] = error_msg
-            results['completed_at'] = time.time()
-            
-            job_data = job_manager.get_job(job_id)
-            if job_data:
-                # Store any partial results that were completed
-                if 'stem_separation' in results.get('stages', {}) and results['stages']['stem_separation'].get('vocals_path'):
-                    job_data.stems = results['stages']['stem_separation']
-                
-                if 'transcription' in results.get('stages', {}) and results['stages']['transcription'].get('transcript_text'):
-                    job_data.lyrics = results['stages']['transcription']
-                
-                if 'beat_analysis' in results.get('stages', {}) and results['stages']['beat_analysis'].get('tempo_bpm'):
-                    job_data.beats = results['stages']['beat_analysis']
-                
-                job_manager.save_job(job_data)
-        
-        raise self.retry(exc=e, countdown=60, max_retries=2)
+        raise
+
+
+@celery_app.task(name='tasks.audio_processing.pipeline_failed')
+def pipeline_failed(request, exc, traceback, job_id: str) -> None:
+    """
+    Error callback of the chord's finalize_pipeline: mark the job failed, once, when a
+    stage task crashed or finalize_pipeline itself raised.
+    """
+    task_logger = get_task_logger("audio_processing")
+    task_logger.error("Processing pipeline failed", job_id=job_id, task_id=request.id, error=str(exc))
+    fail_job(job_id, f"Audio processing failed: {exc}")
+
+
+def store_stage_results(job_data, results: Dict[str, Any]) -> None:
+    """Copy the completed stages' results onto the job."""
+    stages = results.get('stages', {})
+    if 'stem_separation' in stages and stages['stem_separation'].get('vocals_path'):
+        job_data.stems = stages['stem_separation']
+    
+    if 'transcription' in stages and stages['transcription'].get('transcript_text'):
+        job_data.lyrics = stages['transcription']
+    
+    if 'beat_analysis' in stages and stages['beat_analysis'].get('tempo_bpm'):
+        job_data.beats = stages['beat_analysis']
+
+
+def fail_job(job_id: str, error_msg: str, results: Optional[Dict[str, Any]] = None) -> None:
+    """Mark a job failed, storing any partial results that were completed, in one save."""
+    job_data = job_manager.get_job(job_id)
+    if not job_data:
+        return
+    previous_status = job_data.status
+    
+    # Store partial results if available
+    if results is not None:
+        results['success'] = 0  # Convert boolean to int for JSON serialization
+        results['error'] = error_msg
+        results['completed_at'] = time.time()
+        store_stage_results(job_data, results)
+    
+    job_data.status = JobStatus.FAILED
+    job_data.progress = 0
+    job_data.error_message = error_msg
+    job_data.completed_at = time.time()
+    job_manager.save_job(job_data, previous_status)
 
 
 def validate_audio_file(file_path: str) -> Dict[str, Any]:
     """Validate audio file format and basic properties."""
     try:
-        import librosa
-        
-        # Load audio metadata
-        duration = librosa.get_duration(path=file_path)
+        try:
+            # libsndfile reads duration and sample rate from the header without
+            # decoding; reading the first second verifies the data decodes
+            with sf.SoundFile(file_path) as audio:
+                sr, samples = audio.samplerate, audio.frames
+                duration = samples / sr
+                audio.read(frames=min(sr, samples), dtype='float32')
+        except RuntimeError:
+            # Formats libsndfile cannot read (m4a, aac) are decoded through librosa. It stays
+            # a local import: the API imports this module to enqueue jobs and should not
+            # pay for librosa's numba/scipy import chain.
+            import librosa
+            duration = librosa.get_duration(path=file_path)
+            
+            # Try to load a small sample to verify format
+            y, sr = librosa.load(file_path, duration=1.0)
+            samples = len(y)
         
         # Basic validation
         if duration < 1.0:
@@ -255,14 +383,11 @@ def validate_audio_file(file_path: str) -> Dict[str, Any]:
         if duration > 1800:  # 30 minutes
             return {'valid': 0, 'error': 'Audio file too long (> 30 minutes)'}  # Convert boolean to int
         
-        # Try to load a small sample to verify format
-        y, sr = librosa.load(file_path, duration=1.0)
-        
         return {
             'valid': 1,  # Convert boolean to int
             'duration': duration,
             'sample_rate': sr,
-            'samples': len(y)
+            'samples': samples
         }
         
     except Exception as e:
@@ -278,23 +403,29 @@ def finalize_processing(job_id: str, results: Dict[str, Any]) -> Dict[str, Any]:
         
         # Generate metadata file
         metadata_file = output_dir / 'metadata.json'
-        import json
-        with open(metadata_file, 'w') as f:
-            json.dump(results, f, indent=2, default=str)
+        # numpy scalars from the stage results serialize natively; anything else unknown as str
+        metadata_file.write_bytes(orjson.dumps(
+            results,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+            default=str
+        ))
         
         # Create summary of available files
         available_files = []
         
         # Check for stem files
-        stems_dir = job_dir / 'stems'
-        if stems_dir.exists():
-            for stem_file in stems_dir.glob('*.wav'):
-                available_files.append({
-                    'type': 'stem',
-                    'name': stem_file.stem,
-                    'path': str(stem_file),
-                    'size': stem_file.stat().st_size
-                })
+        try:
+            with os.scandir(job_dir / 'stems') as entries:
+                for entry in entries:
+                    if entry.name.endswith('.wav') and entry.is_file():
+                        available_files.append({
+                            'type': 'stem',
+                            'name': entry.name[:-len('.wav')],
+                            'path': entry.path,
+                            'size': entry.stat().st_size
+                        })
+        except FileNotFoundError:
+            pass
         
         # Check for transcription files
         if 'transcription' in results['stages'] and results['stages']['transcription'].get('transcript_path'):
@@ -342,6 +473,7 @@ def cleanup_job_task(self, job_id: str) -> Dict[str, Any]:
         success = file_manager.cleanup_job(job_id)
         
         if success:
+            job_manager.clear_output_files(job_id)
             task_logger.info("Job cleanup completed", job_id=job_id)
             return {'success': 1, 'job_id': job_id}  # Convert boolean to int
         else:
@@ -4,14 +4,45 @@ Provides comprehensive beat detection, tempo analysis, and rhythm extraction for
 """
 
 import os
+import json
+import shutil
+import hashlib
+import orjson
 from pathlib import Path
 from typing import Dict, Any, Optional
 
-from celery_app import celery_app, get_task_logger
+import librosa
+import numpy as np
+from celery.signals import worker_process_init
+
+from celery_app import celery_app, get_task_logger, worker_consumes
+from config import settings
 from database.redis_client import get_redis_client
+from models.job import STATUS_JSON_FIELD
 from ai_models.librosa_handler import get_librosa_handler, LibrosaConfig
 
 
+# Beat analysis results keyed by audio content and the settings that affect them
+BEAT_CACHE_PREFIX = "beat_cache"
+BEAT_CACHE_TTL = 30 * 86400  # 30 days
+BEAT_CACHE_CONFIG_KEYS = ('sample_rate', 'hop_length', 'tempo_min', 'tempo_max', 'beat_tracker', 'onset_detection')
+
+
+@worker_process_init.connect
+def warm_up_librosa(**kwargs):
+    """Run beat tracking on a click track when a beat_analysis worker process starts, so the first job skips numba compilation."""
+    if not settings.preload_models or not worker_consumes('beat_analysis'):
+        return
+    
+    try:
+        sr = 22050
+        clicks = librosa.clicks(times=np.arange(0.0, 4.0, 0.5), sr=sr, length=4 * sr)
+        librosa.beat.beat_track(y=clicks, sr=sr)
+    except Exception as e:
+        # The first job compiles the kernels instead
+        get_task_logger("beat_analysis").warning("Librosa warm-up failed", error=str(e))
+
+
 @celery_app.task(bind=True, name='tasks.beat_analysis.analyze_beats_task')
 def analyze_beats_task(self, job_id: str, audio_file_path: str, job_dir: str, config: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -39,7 +70,7 @@ def analyze_beats_task(self, job_id: str, audio_file_path: str, job_dir: str, co
             redis_client.hset(f"job:{job_id}", {
                 "beat_analysis_status": "processing",
                 "beat_analysis_progress": "0"
-            })
+            }, clear=(STATUS_JSON_FIELD,))
         
         # Validate inputs
         if not os.path.exists(audio_file_path):
@@ -53,96 +84,27 @@ def analyze_beats_task(self, job_id: str, audio_file_path: str, job_dir: str, co
             with get_redis_client() as redis_client:
                 redis_client.hset(f"job:{job_id}", {
                     "beat_analysis_progress": str(progress)
-                })
+                }, clear=(STATUS_JSON_FIELD,))
             task_logger.info("Beat analysis progress", 
                            job_id=job_id, 
                            progress=f"{progress}%")
         
-        # Configure Librosa based on user preferences
-        librosa_config = LibrosaConfig()
-        
-        # Apply user configuration if provided
-        if config:
-            if 'sample_rate' in config:
-                librosa_config.sample_rate = config['sample_rate']
-            if 'hop_length' in config:
-                librosa_config.hop_length = config['hop_length']
-            if 'tempo_min' in config:
-                librosa_config.tempo_min = config['tempo_min']
-            if 'tempo_max' in config:
-                librosa_config.tempo_max = config['tempo_max']
-            if 'beat_tracker' in config:
-                librosa_config.beat_tracker = config['beat_tracker']
-            if 'onset_detection' in config:
-                librosa_config.onset_detection = config['onset_detection']
-        
-        task_logger.info("Librosa configuration", 
-                        sample_rate=librosa_config.sample_rate,
-                        beat_tracker=librosa_config.beat_tracker,
-                        tempo_range=f"{librosa_config.tempo_min}-{librosa_config.tempo_max}")
-        
-        # Get Librosa handler and perform analysis
-        librosa_handler = get_librosa_handler(librosa_config)
-        
         # Create beat analysis output directory
         analysis_dir = os.path.join(job_dir, "beat_analysis")
         
-        # Perform beat and tempo analysis
-        analysis_result = librosa_handler.analyze_audio(
-            audio_path=audio_file_path,
-            output_dir=analysis_dir,
-            progress_callback=progress_callback
-        )
-        
-        if not analysis_result['success']:
-            raise RuntimeError(analysis_result.get('error', 'Beat analysis failed'))
-        
-        # Extract key results
-        analysis_data = analysis_result['analysis']
-        output_files = analysis_result['output_files']
-        metadata = analysis_result['metadata']
-        
-        # Build final result
-        result = {
-            'success': 1,
-            'tempo_bpm': analysis_result.get('tempo_bpm', 0),
-            'beat_timestamps': analysis_result.get('beats', []),
-            'beat_times': analysis_result.get('beat_times', []),
-            'beat_count': metadata.get('beat_count', 0),
-            'processing_time': metadata.get('processing_time', 0.0),
-            'audio_duration': metadata.get('audio_duration', 0.0),
-            'time_signature': metadata.get('time_signature', '4/4'),
-            
-            # File paths
-            'output_files': output_files,
-            'analysis_json': output_files.get('analysis_json'),
-            'beats_json': output_files.get('beats_json'),
-            'onsets_json': output_files.get('onsets_json'),
-            
-            # Detailed analysis data
-            'audio_properties': analysis_data.get('audio_properties', {}),
-            'tempo_analysis': analysis_data.get('tempo_analysis', {}),
-            'onset_analysis': analysis_data.get('onset_analysis', {}),
-            'rhythm_analysis': analysis_data.get('rhythm_analysis', {}),
-            
-            # Beat grid for karaoke synchronization
-            'beat_grid': analysis_data.get('tempo_analysis', {}).get('beat_grid', []),
-            'beat_confidence': analysis_data.get('tempo_analysis', {}).get('beat_confidence', 0.0),
-            'beat_interval': analysis_data.get('tempo_analysis', {}).get('beat_interval', 0.0),
-            
-            # Onset information
-            'onsets': analysis_result.get('onsets', []),
-            'onset_count': analysis_data.get('onset_analysis', {}).get('onset_count', 0),
-            'onset_density': analysis_data.get('onset_analysis', {}).get('onset_density', 0.0),
-            
-            # Rhythm characteristics
-            'rhythm_regularity': analysis_data.get('rhythm_analysis', {}).get('rhythm_regularity', 0.0),
-            'rhythm_complexity': analysis_data.get('rhythm_analysis', {}).get('rhythm_complexity', 'unknown'),
-            
-            # Quality metrics
-            'tempo_confidence': analysis_data.get('tempo_analysis', {}).get('tempo_confidence', 0.0),
-            'has_strong_beat': 1 if (metadata.get('beat_count', 0) > 10 and analysis_data.get('tempo_analysis', {}).get('beat_confidence', 0) > 0.5) else 0
-        }
+        # Identical audio analysed with the same settings reuses the earlier result
+        cache_key = beat_cache_key(job_id, config)
+        result = load_cached_beats(cache_key, analysis_dir) if cache_key else None
+        if result is not None:
+            task_logger.info("Beat analysis cache hit", job_id=job_id, cache_key=cache_key)
+        else:
+            result = run_beat_analysis(audio_file_path, analysis_dir, config, progress_callback, task_logger)
+            # Librosa returns numpy scalars; serialize once and use the native-typed
+            # round trip both for the cache and for the task result
+            payload = orjson.dumps(result, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS, default=str)
+            result = orjson.loads(payload)
+            if cache_key:
+                store_cached_beats(cache_key, payload, task_logger)
         
         # Update job status with results
         with get_redis_client() as redis_client:
@@ -165,7 +127,7 @@ def analyze_beats_task(self, job_id: str, audio_file_path: str, job_dir: str, co
                 "beat_analysis_json": result.get('analysis_json', ''),
                 "beats_json": result.get('beats_json', ''),
                 "onsets_json": result.get('onsets_json', '')
-            })
+            }, clear=(STATUS_JSON_FIELD,))
         
         task_logger.info("Beat analysis completed successfully", 
                         job_id=job_id,
@@ -190,7 +152,7 @@ def analyze_beats_task(self, job_id: str, audio_file_path: str, job_dir: str, co
             redis_client.hset(f"job:{job_id}", {
                 "beat_analysis_status": "error",
                 "beat_analysis_error": error_msg
-            })
+            }, clear=(STATUS_JSON_FIELD,))
         
         return {
             'success': 0,
@@ -217,4 +179,147 @@ def analyze_beats_task(self, job_id: str, audio_file_path: str, job_dir: str, co
             'rhythm_complexity': 'unknown',
             'tempo_confidence': 0.0,
             'has_strong_beat': 0
-        } 
\ No newline at end of file
+        }
+
+def audio_fingerprint(job_id: str) -> Optional[str]:
+    """
+    Content fingerprint of a job's audio: the SHA-256 computed while the upload was saved.
+    
+    Jobs uploaded before the hash was recorded have none and are not cached; a partial
+    hash could match a different track and serve its beats.
+    """
+    with get_redis_client() as redis_client:
+        return redis_client.hget(f"job:{job_id}", "file_hash", parse_json=False) or None
+
+
+def beat_cache_key(job_id: str, config: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Cache key for a job's audio analysed with the given configuration (None if uncacheable)."""
+    fingerprint = audio_fingerprint(job_id)
+    if fingerprint is None:
+        return None
+    analysis_settings = {key: (config or {}).get(key) for key in BEAT_CACHE_CONFIG_KEYS}
+    config_hash = hashlib.sha1(json.dumps(analysis_settings, sort_keys=True).encode()).hexdigest()
+    return f"{BEAT_CACHE_PREFIX}:{fingerprint}:{config_hash}"
+
+
+def store_cached_beats(cache_key: str, payload: bytes, task_logger) -> None:
+    """Cache a serialized analysis result; a failed write only costs a later recomputation."""
+    try:
+        with get_redis_client() as redis_client:
+            redis_client.client.set(cache_key, payload, ex=BEAT_CACHE_TTL)
+    except Exception as e:
+        task_logger.warning("Failed to cache beat analysis", cache_key=cache_key, error=str(e))
+
+
+def load_cached_beats(cache_key: str, analysis_dir: str) -> Optional[Dict[str, Any]]:
+    """
+    Return a cached analysis result with its output files copied into analysis_dir.
+    
+    Returns None on a miss, or when the cached files are gone (their job was cleaned up).
+    """
+    with get_redis_client() as redis_client:
+        result = redis_client.get(cache_key)
+    if not isinstance(result, dict):
+        return None
+    
+    try:
+        os.makedirs(analysis_dir, exist_ok=True)
+        output_files = {}
+        for name, path in result.get('output_files', {}).items():
+            output_files[name] = shutil.copy2(path, os.path.join(analysis_dir, os.path.basename(path)))
+    except OSError:
+        return None
+    
+    result['output_files'] = output_files
+    for name in ('analysis_json', 'beats_json', 'onsets_json'):
+        result[name] = output_files.get(name)
+    return result
+
+
+def run_beat_analysis(audio_file_path: str, analysis_dir: str, config: Optional[Dict[str, Any]],
+                      progress_callback, task_logger) -> Dict[str, Any]:
+    """Run the Librosa beat analysis and build the task result."""
+    # Configure Librosa based on user preferences
+    librosa_config = LibrosaConfig()
+    
+    # Apply user configuration if provided
+    if config:
+        if 'sample_rate' in config:
+            librosa_config.sample_rate = config['sample_rate']
+        if 'hop_length' in config:
+            librosa_config.hop_length = config['hop_length']
+        if 'tempo_min' in config:
+            librosa_config.tempo_min = config['tempo_min']
+        if 'tempo_max' in config:
+            librosa_config.tempo_max = config['tempo_max']
+        if 'beat_tracker' in config:
+            librosa_config.beat_tracker = config['beat_tracker']
+        if 'onset_detection' in config:
+            librosa_config.onset_detection = config['onset_detection']
+    
+    task_logger.info("Librosa configuration", 
+                    sample_rate=librosa_config.sample_rate,
+                    beat_tracker=librosa_config.beat_tracker,
+                    tempo_range=f"{librosa_config.tempo_min}-{librosa_config.tempo_max}")
+    
+    # Get Librosa handler and perform analysis
+    librosa_handler = get_librosa_handler(librosa_config)
+    
+    # Perform beat and tempo analysis
+    analysis_result = librosa_handler.analyze_audio(
+        audio_path=audio_file_path,
+        output_dir=analysis_dir,
+        progress_callback=progress_callback
+    )
+    
+    if not analysis_result['success']:
+        raise RuntimeError(analysis_result.get('error', 'Beat analysis failed'))
+    
+    # Extract key results
+    analysis_data = analysis_result['analysis']
+    output_files = analysis_result['output_files']
+    metadata = analysis_result['metadata']
+    
+    # Build final result
+    result = {
+        'success': 1,
+        'tempo_bpm': analysis_result.get('tempo_bpm', 0),
+        'beat_timestamps': analysis_result.get('beats', []),
+        'beat_times': analysis_result.get('beat_times', []),
+        'beat_count': metadata.get('beat_count', 0),
+        'processing_time': metadata.get('processing_time', 0.0),
+        'audio_duration': metadata.get('audio_duration', 0.0),
+        'time_signature': metadata.get('time_signature', '4/4'),
+        
+        # File paths
+        'output_files': output_files,
+        'analysis_json': output_files.get('analysis_json'),
+        'beats_json': output_files.get('beats_json'),
+        'onsets_json': output_files.get('onsets_json'),
+        
+        # Detailed analysis data
+        'audio_properties': analysis_data.get('audio_properties', {}),
+        'tempo_analysis': analysis_data.get('tempo_analysis', {}),
+        'onset_analysis': analysis_data.get('onset_analysis', {}),
+        'rhythm_analysis': analysis_data.get('rhythm_analysis', {}),
+        
+        # Beat grid for karaoke synchronization
+        'beat_grid': analysis_data.get('tempo_analysis', {}).get('beat_grid', []),
+        'beat_confidence': analysis_data.get('tempo_analysis', {}).get('beat_confidence', 0.0),
+        'beat_interval': analysis_data.get('tempo_analysis', {}).get('beat_interval', 0.0),
+        
+        # Onset information
+        'onsets': analysis_result.get('onsets', []),
+        'onset_count': analysis_data.get('onset_analysis', {}).get('onset_count', 0),
+        'onset_density': analysis_data.get('onset_analysis', {}).get('onset_density', 0.0),
+        
+        # Rhythm characteristics
+        'rhythm_regularity': analysis_data.get('rhythm_analysis', {}).get('rhythm_regularity', 0.0),
+        'rhythm_complexity': analysis_data.get('rhythm_analysis', {}).get('rhythm_complexity', 'unknown'),
+        
+        # Quality metrics
+        'tempo_confidence': analysis_data.get('tempo_analysis', {}).get('tempo_confidence', 0.0),
+        'has_strong_beat': 1 if (metadata.get('beat_count', 0) > 10 and analysis_data.get('tempo_analysis', {}).get('beat_confidence', 0) > 0.5) else 0
+    }
+    
+    return result
@@ -8,9 +8,28 @@ import time
 from pathlib import Path
 from typing import Dict, Any, Optional
 
-from celery_app import celery_app, get_task_logger
-from models.job import job_manager, JobStatus, ProcessingStep
+from celery.signals import worker_process_init
+
+from celery_app import celery_app, get_task_logger, worker_consumes
+from models.job import job_manager, JobStatus, ProcessingStep, STAGES_PROGRESS_START, STAGES_PROGRESS_SPAN
 from ai_models.demucs_handler import get_demucs_handler, DemucsConfig
+from config import settings
+
+
+@worker_process_init.connect
+def preload_demucs_model(**kwargs):
+    """
+    Load the default Demucs model when a stem_separation worker process starts, so the
+    first job skips the load. celery_app raises worker_proc_alive_timeout to cover it.
+    """
+    if not settings.preload_models or not worker_consumes('stem_separation'):
+        return
+    
+    try:
+        get_demucs_handler(DemucsConfig())._load_model()
+    except Exception as e:
+        # The task loads the model itself on first use
+        get_task_logger("stem_separation").warning("Demucs model preload failed", error=str(e))
 
 
 @celery_app.task(bind=True, name='tasks.stem_separation.separate_stems_task')
@@ -33,13 +52,6 @@ def separate_stems_task(self, job_id: str, audio_file_path: str, config: Dict[st
     task_logger.info("Starting Demucs stem separation", job_id=job_id, audio_file=audio_file_path)
     
     try:
-        # Update job progress
-        job_manager.update_job_progress(
-            job_id=job_id,
-            progress=5,
-            current_step=ProcessingStep.STEM_SEPARATION
-        )
-        
         # Validate input file
         if not os.path.exists(audio_file_path):
             raise FileNotFoundError(f"Audio file not found: {audio_file_path}")
@@ -59,8 +71,10 @@ def separate_stems_task(self, job_id: str, audio_file_path: str, config: Dict[st
         
         # Apply config overrides if provided
         if config:
-            if 'model_name' in config:
-                demucs_config.model_name = config['model_name']
+            # /process stores the form's choice as demucs_model
+            model_name = config.get('model_name') or config.get('demucs_model')
+            if model_name:
+                demucs_config.model_name = model_name
             if 'device' in config:
                 demucs_config.device = config['device']
             if 'shifts' in config:
@@ -78,8 +92,9 @@ def separate_stems_task(self, job_id: str, audio_file_path: str, config: Dict[st
         
         # Progress tracking callback
         def progress_callback(progress: int):
-            # Map Demucs progress (0-100) to our task progress (10-90)
-            task_progress = 10 + int(progress * 0.8)
+            # Map Demucs progress (0-100) onto the pipeline's stage range (30-85);
+            # beat analysis runs alongside and only reports its own stage progress
+            task_progress = STAGES_PROGRESS_START + int(progress * STAGES_PROGRESS_SPAN / 100)
             job_manager.update_job_progress(
                 job_id=job_id,
                 progress=task_progress,
@@ -105,7 +120,7 @@ def separate_stems_task(self, job_id: str, audio_file_path: str, config: Dict[st
         # Update final progress
         job_manager.update_job_progress(
             job_id=job_id,
-            progress=100,
+            progress=STAGES_PROGRESS_START + STAGES_PROGRESS_SPAN,
             current_step=ProcessingStep.STEM_SEPARATION
         )
         
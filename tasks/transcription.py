@@ -9,6 +9,7 @@ from typing import Dict, Any, Optional
 
 from celery_app import celery_app, get_task_logger
 from database.redis_client import get_redis_client
+from models.job import STATUS_JSON_FIELD
 from ai_models.whisper_handler import get_whisper_handler, WhisperConfig
 
 
@@ -39,7 +40,7 @@ def transcribe_audio_task(self, job_id: str, vocal_stem_path: str, job_dir: str,
             redis_client.hset(f"job:{job_id}", {
                 "transcription_status": "processing",
                 "transcription_progress": "0"
-            })
+            }, clear=(STATUS_JSON_FIELD,))
         
         # Validate inputs
         if not os.path.exists(vocal_stem_path):
@@ -53,7 +54,7 @@ def transcribe_audio_task(self, job_id: str, vocal_stem_path: str, job_dir: str,
             with get_redis_client() as redis_client:
                 redis_client.hset(f"job:{job_id}", {
                     "transcription_progress": str(progress)
-                })
+                }, clear=(STATUS_JSON_FIELD,))
             task_logger.info("Transcription progress", 
                            job_id=job_id, 
                            progress=f"{progress}%")
@@ -63,8 +64,10 @@ def transcribe_audio_task(self, job_id: str, vocal_stem_path: str, job_dir: str,
         
         # Apply user configuration if provided
         if config:
-            if 'model_name' in config:
-                whisper_config.model_name = config['model_name']
+            # /process stores the form's choice as whisper_model
+            model_name = config.get('model_name') or config.get('whisper_model')
+            if model_name:
+                whisper_config.model_name = model_name
             if 'language' in config:
                 whisper_config.language = config['language']
             if 'device' in config:
@@ -135,7 +138,7 @@ def transcribe_audio_task(self, job_id: str, vocal_stem_path: str, job_dir: str,
                 "transcription_language": result['language'],
                 "transcription_duration": str(result['duration']),
                 "word_count": str(result['word_count'])
-            })
+            }, clear=(STATUS_JSON_FIELD,))
         
         task_logger.info("Transcription completed successfully", 
                         job_id=job_id,
@@ -159,7 +162,7 @@ def transcribe_audio_task(self, job_id: str, vocal_stem_path: str, job_dir: str,
             redis_client.hset(f"job:{job_id}", {
                 "transcription_status": "error",
                 "transcription_error": error_msg
-            })
+            }, clear=(STATUS_JSON_FIELD,))
         
         return {
             'success': 0,
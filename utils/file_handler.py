@@ -17,6 +17,9 @@ from utils.logger import get_logger
 
 logger = get_logger("file_handler")
 
+# Uploads are copied to disk 1 MiB at a time: few event-loop round trips, bounded memory
+UPLOAD_CHUNK_SIZE = 1 << 20
+
 
 class FileValidator:
     """File validation and security checks."""
@@ -142,8 +145,8 @@ class FileStorage:
         logger.info("Created job directory", job_id=job_id, path=str(job_dir))
         return job_dir
     
-    async def save_upload_file(self, upload_file: UploadFile, job_id: str) -> Tuple[str, str]:
-        """Save uploaded file and return file path and hash."""
+    async def save_upload_file(self, upload_file: UploadFile, job_id: str) -> Tuple[str, str, int]:
+        """Save uploaded file and return file path, hash and size."""
         # Create job directory
         job_dir = self.create_job_directory(job_id)
         
@@ -153,11 +156,13 @@ class FileStorage:
         
         # Save file with chunked writing for memory efficiency
         file_hash = hashlib.sha256()
+        file_size = 0
         
         try:
             async with aiofiles.open(file_path, 'wb') as f:
-                while chunk := await upload_file.read(8192):  # 8KB chunks
+                while chunk := await upload_file.read(UPLOAD_CHUNK_SIZE):
                     file_hash.update(chunk)
+                    file_size += len(chunk)
                     await f.write(chunk)
             
             # Set file permissions
@@ -169,10 +174,10 @@ class FileStorage:
                 job_id=job_id,
                 filename=safe_filename,
                 file_hash=file_hash_hex,
-                file_size=file_path.stat().st_size
+                file_size=file_size
             )
             
-            return str(file_path), file_hash_hex
+            return str(file_path), file_hash_hex, file_size
             
         except Exception as e:
             # Cleanup on failure
@@ -305,10 +310,7 @@ class FileManager:
                 )
             
             # Save file
-            file_path, file_hash = await self.storage.save_upload_file(upload_file, job_id)
-            
-            # Get actual file size
-            actual_size = Path(file_path).stat().st_size
+            file_path, file_hash, actual_size = await self.storage.save_upload_file(upload_file, job_id)
             
             # Validate file size again (in case size wasn't provided)
             if not self.validator.validate_file_size(actual_size):
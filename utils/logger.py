@@ -50,8 +50,16 @@ def setup_logging():
 class Logger:
     """Custom logger wrapper with structured logging."""
     
-    def __init__(self, name: str = "karaoke-backend"):
-        self._logger = structlog.get_logger(name)
+    def __init__(self, name: str = "karaoke-backend", bound_logger: Any = None):
+        self._logger = bound_logger if bound_logger is not None else structlog.get_logger(name)
+    
+    def bind(self, **kwargs: Any) -> "Logger":
+        """Return a logger that adds the given context to every message."""
+        return Logger(bound_logger=self._logger.bind(**kwargs))
+    
+    def is_enabled_for(self, level: int) -> bool:
+        """Check whether messages at a standard logging level would be emitted."""
+        return self._logger.isEnabledFor(level)
     
     def debug(self, message: str, **kwargs: Any):
         """Log debug message."""